@@ -0,0 +1,90 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# Lo que se importa al abrir la app, y los subsistemas que ahora se cargan al primer uso
+DEFAULT_MODULES = [
+    "main",
+    "core.instagram_comparator",
+    "core.account_catalog",
+    "core.prefetcher",
+    "core.instagram_extractor",
+    "core.exporter",
+    "utils.thumbnail_cache",
+]
+
+
+def import_time(module):
+    """Cumulative import time (seconds) of a module in a fresh interpreter, from -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC_DIR,
+        env={**os.environ, "PYTHONPATH": str(SRC_DIR)},
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return None
+
+    # Formato: "import time: self [us] | cumulative | imported package"
+    for line in reversed(result.stderr.splitlines()):
+        parts = [part.strip() for part in line.removeprefix("import time:").split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1_000_000
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de importación de los módulos de la app")
+    parser.add_argument("--modules", default=",".join(DEFAULT_MODULES))
+    parser.add_argument("--repeat", type=int, default=5, help="Se reporta la mediana")
+    parser.add_argument("--baseline", default=str(RESULTS_DIR / "import_baseline.json"))
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=20.0,
+                        help="Porcentaje a partir del cual un cambio se marca como regresión")
+    args = parser.parse_args()
+
+    results = {}
+    for module in [name for name in args.modules.split(",") if name]:
+        samples = [import_time(module) for _ in range(args.repeat)]
+        samples = [sample for sample in samples if sample is not None]
+        results[module] = round(statistics.median(samples), 6) if samples else None
+
+    baseline = {}
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline guardado en {baseline_path}")
+    elif baseline_path.exists():
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    regressions = 0
+    print(f"{'module':<30}{'seconds':>12}{'baseline':>12}{'change':>10}")
+    for module, seconds in results.items():
+        if seconds is None:
+            print(f"{module:<30}{'error':>12}")
+            continue
+        before = baseline.get(module)
+        if not before:
+            print(f"{module:<30}{seconds:>12.4f}")
+            continue
+        change = (seconds - before) / before * 100
+        flag = "  <-- regresión" if change > args.threshold else ""
+        regressions += bool(flag)
+        print(f"{module:<30}{seconds:>12.4f}{before:>12.4f}{change:>9.1f}%{flag}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
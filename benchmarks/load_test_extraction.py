@@ -0,0 +1,100 @@
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from core.fake_instagram_client import FakeInstagramClient  # noqa: E402
+from core.instagram_extractor import SimpleInstagramExtractor  # noqa: E402
+
+logger = logging.getLogger("load_test")
+
+
+def run_extraction(client, work_dir, account, retry_backoff):
+    sessions_dir = work_dir / "sessions"
+    data_dir = work_dir / "data"
+    sessions_dir.mkdir(exist_ok=True)
+    data_dir.mkdir(exist_ok=True)
+
+    extractor = SimpleInstagramExtractor(sessions_dir, data_dir, logger, client=client)
+    extractor.pause_seconds = 0
+    extractor.retry_backoff_seconds = retry_backoff
+    extractor.login("load_test", "load_test")
+
+    started = time.perf_counter()
+    result = extractor.extract_account(account)
+    seconds = time.perf_counter() - started
+
+    # El extractor registra los errores y sigue con listas vacías: eso también es un fallo
+    stats = result["data"]["stats"] if result else {}
+    complete = bool(stats) and (
+        stats["total_followers"] == stats["expected_followers"]
+        and stats["total_following"] == stats["expected_following"]
+    )
+    return {
+        "seconds": seconds,
+        "pages": client.page_count,
+        "requests": client.request_count,
+        "rate_limited": client.rate_limited_count,
+        "followers": stats.get("total_followers", 0),
+        "complete": complete,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de la extracción con un cliente simulado")
+    parser.add_argument("--followers", type=int, default=100_000)
+    parser.add_argument("--following", type=int, default=1_000)
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0, help="Segundos por petición")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Segundos aleatorios extra por petición")
+    parser.add_argument("--rate-limit-every", type=int, default=None,
+                        help="Responder 429 cada N peticiones")
+    parser.add_argument("--fail-after-pages", type=int, default=None,
+                        help="Cortar la conexión una vez tras N páginas")
+    parser.add_argument("--retry-backoff", type=float, default=0.0,
+                        help="Espera base entre reintentos (segundos)")
+    parser.add_argument("--runs", type=int, default=2,
+                        help="La segunda ejecución y siguientes incluyen el cálculo de cambios")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.ERROR,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+
+    account = "load_test_target"
+    accounts = {account: {"followers": args.followers, "following": args.following}}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        print(f"{'run':>4}{'seconds':>10}{'pages':>8}{'requests':>10}{'429':>6}{'pages/s':>10}{'followers/s':>14}{'result':>10}")
+        failures = 0
+        for run in range(1, args.runs + 1):
+            client = FakeInstagramClient(
+                accounts,
+                page_size=args.page_size,
+                latency=args.latency,
+                jitter=args.jitter,
+                rate_limit_every=args.rate_limit_every,
+                fail_after_pages=args.fail_after_pages,
+                seed=run,
+            )
+            stats = run_extraction(client, work_dir, account, args.retry_backoff)
+            seconds = stats["seconds"] or 1e-9
+            failures += not stats["complete"]
+            print(
+                f"{run:>4}{stats['seconds']:>10.3f}{stats['pages']:>8}{stats['requests']:>10}"
+                f"{stats['rate_limited']:>6}{stats['pages'] / seconds:>10.1f}{stats['followers'] / seconds:>14.0f}"
+                f"{'ok' if stats['complete'] else 'FALLO':>10}"
+            )
+    if failures:
+        raise SystemExit(f"{failures} de {args.runs} extracciones incompletas")
+
+
+if __name__ == "__main__":
+    main()
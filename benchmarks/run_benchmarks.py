@@ -0,0 +1,156 @@
+import argparse
+import json
+import logging
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from core.instagram_comparator import InstagramComparator  # noqa: E402
+from utils.helpers import (  # noqa: E402
+    create_comparison_lists,
+    get_json_files_for_account,
+    get_list_page,
+    load_json_file,
+    snapshot_dir_for,
+)
+from utils.snapshot_cache import snapshot_cache  # noqa: E402
+
+from synthetic import generate_history, write_history  # noqa: E402
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+DEFAULT_FILE_COUNTS = [100, 1_000]
+
+logger = logging.getLogger("benchmarks")
+
+
+def measure(function):
+    """Wall time of one cold run, then peak memory of a second run under tracemalloc"""
+    snapshot_cache.invalidate()
+    started = time.perf_counter()
+    function()
+    seconds = time.perf_counter() - started
+
+    snapshot_cache.invalidate()
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": round(seconds, 6), "peak_bytes": peak}
+
+
+def bench_snapshots(size, work_dir):
+    data_dir = work_dir / f"size_{size}"
+    data_dir.mkdir()
+    file1, file2 = write_history(data_dir, generate_history("bench", size, snapshots=2, seed=size))
+    comparator = InstagramComparator(data_dir, logger)
+    comparison = comparator.compare_data(file1, file2)
+
+    def format_lists():
+        lists = create_comparison_lists(comparison)
+        for list_source in lists.values():
+            get_list_page(list_source["items"], 0, 100)
+
+    return {
+        "load_json_file": measure(lambda: load_json_file(file2)),
+        "compare_data": measure(lambda: comparator.compare_data(file1, file2)),
+        "create_comparison_lists": measure(format_lists),
+    }
+
+
+def bench_listing(file_count, work_dir):
+    data_dir = work_dir / f"files_{file_count}"
+    data_dir.mkdir()
+    # Archivos pequeños repartidos entre 50 cuentas
+    for index in range(file_count):
+        account = f"account{index % 50}"
+        timestamp = (datetime(2025, 1, 1) + timedelta(minutes=index)).strftime("%Y%m%d%H%M")
+        snapshot_dir = snapshot_dir_for(data_dir, account, timestamp)
+        snapshot_dir.mkdir(parents=True, exist_ok=True)
+        (snapshot_dir / f"{account}_data_{timestamp}.json").write_text("{}", encoding="utf-8")
+
+    comparator = InstagramComparator(data_dir, logger)
+    return {
+        "get_json_files_for_account": measure(lambda: get_json_files_for_account("account7", data_dir, logger)),
+        "find_account_files": measure(lambda: comparator.find_account_files("account7")),
+    }
+
+
+def compare_to_baseline(results, baseline):
+    """Rows of (benchmark, size, metric, baseline, current, change %)"""
+    rows = []
+    for group in ("snapshots", "listing"):
+        for size, benchmarks in results[group].items():
+            for name, metrics in benchmarks.items():
+                previous = baseline.get(group, {}).get(size, {}).get(name)
+                if not previous:
+                    continue
+                for metric in ("seconds", "peak_bytes"):
+                    before = previous[metric]
+                    after = metrics[metric]
+                    change = (after - before) / before * 100 if before else 0.0
+                    rows.append((name, size, metric, before, after, change))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del comparador, cargadores y formateadores")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Seguidores por snapshot, p. ej. 1000,100000,1000000,5000000")
+    parser.add_argument("--file-counts", default=",".join(map(str, DEFAULT_FILE_COUNTS)),
+                        help="Archivos en data_dir para los benchmarks de listado, p. ej. 10000")
+    parser.add_argument("--baseline", default=str(RESULTS_DIR / "baseline.json"))
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Porcentaje a partir del cual un cambio se marca como regresión")
+    args = parser.parse_args()
+
+    results = {
+        "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "snapshots": {},
+        "listing": {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        for size in [int(value) for value in args.sizes.split(",") if value]:
+            print(f"snapshots: {size} seguidores...")
+            results["snapshots"][str(size)] = bench_snapshots(size, work_dir)
+        for file_count in [int(value) for value in args.file_counts.split(",") if value]:
+            print(f"listing: {file_count} archivos...")
+            results["listing"][str(file_count)] = bench_listing(file_count, work_dir)
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    output_path = RESULTS_DIR / f"results_{datetime.now().strftime('%Y%m%d%H%M%S')}.json"
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Resultados: {output_path}")
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline guardado en {baseline_path}")
+    elif baseline_path.exists():
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = 0
+        print(f"{'benchmark':<28}{'size':>10}{'metric':>12}{'baseline':>14}{'current':>14}{'change':>10}")
+        for name, size, metric, before, after, change in compare_to_baseline(results, baseline):
+            flag = "  <-- regresión" if change > args.threshold else ""
+            regressions += bool(flag)
+            print(f"{name:<28}{size:>10}{metric:>12}{before:>14.6g}{after:>14.6g}{change:>9.1f}%{flag}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
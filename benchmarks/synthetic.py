@@ -0,0 +1,91 @@
+import json
+import random
+from datetime import datetime, timedelta
+
+FIRST_PARTS = [
+    "ana", "luis", "maria", "jose", "carlos", "sofia", "diego", "valeria", "juan",
+    "camila", "alex", "dani", "fer", "pau", "leo", "mar", "sam", "nico", "isa", "emi",
+    "the", "its", "real", "official", "just", "mr", "ms", "dj", "chef", "foto",
+]
+SECOND_PARTS = [
+    "garcia", "lopez", "martinez", "rodriguez", "perez", "gomez", "sanchez", "diaz",
+    "travel", "fit", "art", "music", "design", "studio", "shop", "life", "vibes",
+    "mx", "cdmx", "gdl", "style", "photo", "daily", "world", "club", "store",
+]
+SEPARATORS = ["", "", "", "_", ".", "__"]
+
+
+def random_username(rng) -> str:
+    username = rng.choice(FIRST_PARTS) + rng.choice(SEPARATORS) + rng.choice(SECOND_PARTS)
+    roll = rng.random()
+    if roll < 0.55:
+        username += str(rng.randint(0, 9999))
+    elif roll < 0.7:
+        username += rng.choice(SEPARATORS) + rng.choice(SECOND_PARTS)
+    if rng.random() < 0.1:
+        username = rng.choice(["_", "x", "the."]) + username
+    return username[:30]
+
+
+def unique_usernames(rng, count, exclude=()) -> list:
+    seen = set(exclude)
+    usernames = []
+    while len(usernames) < count:
+        username = random_username(rng)
+        if username in seen:
+            username = f"{username}{rng.randint(0, 999999)}"[:30]
+            if username in seen:
+                continue
+        seen.add(username)
+        usernames.append(username)
+    return usernames
+
+
+def generate_history(account, followers_count, snapshots=2, churn_rate=0.02,
+                     growth_rate=0.01, following_ratio=0.3, mutual_ratio=0.5, seed=0) -> list:
+    """Snapshot dicts (same shape as extract_account) with per-snapshot churn"""
+    rng = random.Random(seed)
+    followers = unique_usernames(rng, followers_count)
+    following_count = max(1, int(followers_count * following_ratio))
+    mutuals = rng.sample(followers, min(len(followers), int(following_count * mutual_ratio)))
+    following = mutuals + unique_usernames(rng, following_count - len(mutuals), exclude=followers)
+
+    history = []
+    date = datetime(2025, 1, 1, 12, 0)
+    for index in range(snapshots):
+        if index:
+            lost = int(len(followers) * churn_rate)
+            gained = lost + int(len(followers) * growth_rate)
+            lost_set = set(rng.sample(followers, lost))
+            followers = [u for u in followers if u not in lost_set]
+            followers += unique_usernames(rng, gained, exclude=set(followers) | lost_set)
+            unfollowed = set(rng.sample(following, int(len(following) * churn_rate)))
+            following = [u for u in following if u not in unfollowed]
+            following += rng.sample(followers, min(len(followers), len(unfollowed)))
+            date += timedelta(days=1)
+
+        history.append({
+            "account": account,
+            "followers": list(followers),
+            "following": list(dict.fromkeys(following)),
+            "extraction_date": date.strftime("%Y-%m-%d %H:%M:%S"),
+            "account_info": {"full_name": account, "is_private": False},
+            "stats": {
+                "total_followers": len(followers),
+                "total_following": len(following),
+                "expected_followers": len(followers),
+                "expected_following": len(following),
+            },
+        })
+    return history
+
+
+def write_history(data_dir, history) -> list:
+    paths = []
+    for data in history:
+        timestamp = datetime.strptime(data["extraction_date"], "%Y-%m-%d %H:%M:%S")
+        path = data_dir / f"{data['account']}_data_{timestamp.strftime('%Y%m%d%H%M')}.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        paths.append(str(path))
+    return paths
@@ -0,0 +1,260 @@
+import argparse
+import asyncio
+import json
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from config.settings import (
+    API_CATALOG_REFRESH_SECONDS,
+    API_HOST,
+    API_MAX_PAGE_SIZE,
+    API_PAGE_SIZE,
+    API_PORT,
+    API_WORKER_THREADS,
+    setup_logger,
+)
+from core.account_catalog import get_account_catalog
+from core.instagram_comparator import InstagramComparator
+from utils.search_index import get_prefix_index
+from utils.snapshot_cache import snapshot_cache, snapshot_version_key
+
+RELATIONS = ("followers", "following")
+
+# Carpeta src/, donde la app guarda datos, sesiones y logs
+SRC_DIR = Path(__file__).resolve().parents[1]
+
+# Tamaño de los trozos del JSON de comparación enviado en streaming
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+class ExtractionRequest(BaseModel):
+    account: str
+    username: Optional[str] = None
+    password: Optional[str] = None
+
+
+class ExtractionJobs:
+    """Serial extraction queue: one worker thread, so Instagram sees a single client"""
+
+    def __init__(self, sessions_dir, data_dir, logger):
+        self.sessions_dir = sessions_dir
+        self.data_dir = data_dir
+        self.logger = logger
+        self.jobs = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="extraction")
+        self._extractor = None
+
+    def enqueue(self, request: ExtractionRequest) -> dict:
+        job = {
+            'job_id': uuid.uuid4().hex[:12],
+            'account': request.account,
+            'status': 'queued',
+            'queued_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'filename': None,
+            'stats': None,
+            'error': None,
+        }
+        with self._lock:
+            self.jobs[job['job_id']] = job
+        self._executor.submit(self._run, job, request.username, request.password)
+        return dict(job)
+
+    def get(self, job_id) -> Optional[dict]:
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _update(self, job, **fields):
+        with self._lock:
+            job.update(fields)
+
+    def _run(self, job, username, password):
+        self._update(job, status='running')
+        try:
+            if self._extractor is None:
+                from core.instagram_extractor import SimpleInstagramExtractor
+                self._extractor = SimpleInstagramExtractor(self.sessions_dir, self.data_dir, self.logger)
+
+            if not self._extractor.logged_in and not self._extractor.login(username, password):
+                self._update(job, status='failed', error="Error al iniciar sesión")
+                return
+
+            result = self._extractor.extract_account(job['account'])
+            if result and result.get('success'):
+                self._update(job, status='done', filename=result['filename'], stats=result['data']['stats'])
+            else:
+                self._update(job, status='failed', error="Error extrayendo datos")
+        except Exception as e:
+            self.logger.error(f"Error en la extracción de @{job['account']}: {e}")
+            self._update(job, status='failed', error=str(e))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_json_chunks(data, chunk_bytes=STREAM_CHUNK_BYTES):
+    """Encode data incrementally, yielding chunks of about chunk_bytes"""
+    buffer = []
+    size = 0
+    for piece in json.JSONEncoder(ensure_ascii=False).iterencode(data):
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_bytes:
+            yield "".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def create_app(data_dir, sessions_dir, logger) -> FastAPI:
+    """HTTP API over the snapshots in data_dir, sharing the process snapshot cache"""
+    data_dir = Path(data_dir)
+    app = FastAPI(title="Instagram Data Analyzer API")
+    executor = ThreadPoolExecutor(max_workers=API_WORKER_THREADS, thread_name_prefix="api")
+    comparator = InstagramComparator(data_dir, logger)
+    extraction_jobs = ExtractionJobs(sessions_dir, data_dir, logger)
+    # Cargar el catálogo en segundo plano para que la primera petición no lo espere
+    executor.submit(get_account_catalog, data_dir, logger)
+
+    async def run_blocking(function, *args):
+        return await asyncio.get_running_loop().run_in_executor(executor, function, *args)
+
+    def catalog():
+        return get_account_catalog(data_dir, logger).refresh_if_stale(API_CATALOG_REFRESH_SECONDS)
+
+    def snapshot_info(account, filename) -> dict:
+        # Solo archivos del catálogo: nunca se construyen rutas desde la petición
+        for file_info in catalog().files_for(account):
+            if file_info['filename'] == filename:
+                return file_info
+        raise HTTPException(status_code=404, detail=f"Snapshot no encontrado: {filename}")
+
+    @app.on_event("shutdown")
+    def shutdown():
+        executor.shutdown(wait=False, cancel_futures=True)
+        extraction_jobs.shutdown()
+
+    # =====================| Cuentas y snapshots |=====================
+    @app.get("/accounts")
+    async def list_accounts():
+        def accounts():
+            account_catalog = catalog()
+            return [
+                {'account': account, 'snapshots': len(account_catalog.files_for(account))}
+                for account in account_catalog.accounts()
+            ]
+
+        return {'accounts': await run_blocking(accounts)}
+
+    @app.get("/accounts/{account}/snapshots")
+    async def list_snapshots(account: str):
+        files = await run_blocking(lambda: catalog().files_for(account))
+        if not files:
+            raise HTTPException(status_code=404, detail=f"Sin snapshots para @{account}")
+        return {
+            'account': account,
+            'snapshots': [
+                {'filename': info['filename'], 'timestamp': info['timestamp']}
+                for info in files
+            ],
+        }
+
+    @app.get("/accounts/{account}/snapshots/{filename}/{relation}")
+    async def list_users(
+        account: str,
+        filename: str,
+        relation: str,
+        offset: int = Query(0, ge=0),
+        limit: int = Query(API_PAGE_SIZE, ge=1, le=API_MAX_PAGE_SIZE),
+        prefix: Optional[str] = None,
+    ):
+        if relation not in RELATIONS:
+            raise HTTPException(status_code=404, detail=f"Relación desconocida: {relation}")
+        def page():
+            path = snapshot_info(account, filename)['path']
+            users = snapshot_cache.get(path).get(relation, [])
+            if prefix:
+                users = get_prefix_index((snapshot_version_key(path), relation), users).search(prefix)
+            items = users[offset:offset + limit]
+            next_offset = offset + len(items)
+            return {
+                'account': account,
+                'filename': filename,
+                'relation': relation,
+                'total': len(users),
+                'offset': offset,
+                'items': list(items),
+                'next_offset': next_offset if next_offset < len(users) else None,
+            }
+
+        try:
+            return await run_blocking(page)
+        except (OSError, ValueError) as e:
+            raise HTTPException(status_code=500, detail=f"Error cargando {filename}: {e}")
+
+    # =====================| Comparaciones |=====================
+    @app.get("/accounts/{account}/diff")
+    async def diff(account: str, file1: Optional[str] = None, file2: Optional[str] = None):
+        """Compare two snapshots (default: the two most recent); the report is streamed"""
+        def compare():
+            if file1 and file2:
+                path1 = snapshot_info(account, file1)['path']
+                path2 = snapshot_info(account, file2)['path']
+            else:
+                files = catalog().files_for(account)
+                if len(files) < 2:
+                    raise HTTPException(status_code=404, detail="Se necesitan al menos dos snapshots")
+                path1, path2 = files[1]['path'], files[0]['path']
+            return comparator.compare_data(path1, path2)
+
+        comparison = await run_blocking(compare)
+        if not comparison:
+            raise HTTPException(status_code=422, detail="No se pudieron comparar los archivos")
+        return StreamingResponse(iter_json_chunks(comparison), media_type="application/json")
+
+    # =====================| Extracciones |=====================
+    @app.post("/extractions", status_code=202)
+    async def enqueue_extraction(request: ExtractionRequest):
+        return extraction_jobs.enqueue(request)
+
+    @app.get("/extractions/{job_id}")
+    async def extraction_status(job_id: str):
+        job = extraction_jobs.get(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail=f"Trabajo no encontrado: {job_id}")
+        return job
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="API HTTP de snapshots y comparaciones")
+    parser.add_argument("--data-dir", default=str(SRC_DIR / "instagram_data"))
+    parser.add_argument("--sessions-dir", default=str(SRC_DIR / "sessions"))
+    parser.add_argument("--logs-dir", default=str(SRC_DIR / "logs"))
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    args = parser.parse_args()
+
+    for directory in (args.data_dir, args.sessions_dir, args.logs_dir):
+        Path(directory).mkdir(parents=True, exist_ok=True)
+    logger = setup_logger(Path(args.logs_dir))
+
+    app = create_app(Path(args.data_dir), Path(args.sessions_dir), logger)
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,15 @@ def analyze_account_name_field_component(on_analyze_account_name_change):
     )
 
 
+def analyze_account_suggestions_component():
+    return ft.Row(
+        controls=[],  # Se llena con las cuentas que coinciden con el texto
+        wrap=True,
+        spacing=4,
+        width=300,
+    )
+
+
 def analyze_files_found_text_component():
     return ft.Text(
         "Ingresa un nombre de cuenta para buscar archivos",
@@ -59,6 +68,7 @@ def analyze_results_container_component():
 
 def analyze_form_container_component(
     analyze_account_name_field,
+    analyze_account_suggestions,
     analyze_files_found_text,
     analyze_file1_selector,
     analyze_file2_selector,
@@ -75,6 +85,7 @@ def analyze_form_container_component(
                 ),
                 ft.Container(height=20),
                 analyze_account_name_field,
+                analyze_account_suggestions,
                 ft.Container(height=10),
                 analyze_files_found_text,
                 ft.Container(height=15),
@@ -0,0 +1,27 @@
+import flet as ft
+
+
+def export_controls_component(formats, on_export):
+    format_selector = ft.Dropdown(
+        label="Formato",
+        width=120,
+        options=[ft.dropdown.Option(fmt) for fmt in formats],
+        value=formats[0],
+        border_radius=8,
+    )
+    status_text = ft.Text("", size=11, color=ft.Colors.GREY_600)
+
+    return ft.Row(
+        [
+            format_selector,
+            ft.ElevatedButton(
+                "⬇️ Exportar",
+                on_click=lambda e: on_export(format_selector.value, status_text),
+                bgcolor=ft.Colors.GREY_700,
+                color=ft.Colors.WHITE,
+            ),
+            status_text,
+        ],
+        wrap=True,
+        vertical_alignment=ft.CrossAxisAlignment.CENTER,
+    )
@@ -11,6 +11,15 @@ def account_name_field_component(on_account_name_change):
     )
 
 
+def account_suggestions_component():
+    return ft.Row(
+        controls=[],  # Se llena con las cuentas que coinciden con el texto
+        wrap=True,
+        spacing=4,
+        width=300,
+    )
+
+
 def files_found_text_component():
     return ft.Text(
         "Ingresa un nombre de cuenta para buscar archivos",
@@ -50,6 +59,7 @@ def load_results_container_component():
 
 def load_form_container_component(
     account_name_field,
+    account_suggestions,
     files_found_text,
     file_selector,
     load_and_display_file,
@@ -65,6 +75,7 @@ def load_form_container_component(
                 ),
                 ft.Container(height=20),
                 account_name_field,
+                account_suggestions,
                 ft.Container(height=10),
                 files_found_text,
                 ft.Container(height=15),
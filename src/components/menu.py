@@ -1,6 +1,11 @@
 import flet as ft
 
-def main_menu_component(show_data_mine_section, show_load_file_section, show_analyze_data_section):
+def main_menu_component(
+    show_data_mine_section,
+    show_load_file_section,
+    show_analyze_data_section,
+    show_performance_section,
+):
     return ft.Column(
         [
             ft.Text(
@@ -38,6 +43,15 @@ def main_menu_component(show_data_mine_section, show_load_file_section, show_ana
                         bgcolor=ft.Colors.PURPLE_500,
                         color=ft.Colors.WHITE,
                     ),
+                    ft.Container(height=15),
+                    ft.ElevatedButton(
+                        "Performance",
+                        on_click=show_performance_section,
+                        width=200,
+                        height=50,
+                        bgcolor=ft.Colors.BLUE_GREY_500,
+                        color=ft.Colors.WHITE,
+                    ),
                 ],
                 horizontal_alignment=ft.CrossAxisAlignment.CENTER,
             ),
@@ -0,0 +1,155 @@
+import flet as ft
+
+
+def _format_seconds(value):
+    if value is None:
+        return "-"
+    if value < 1:
+        return f"{value * 1000:.1f} ms"
+    return f"{value:.2f} s"
+
+
+def performance_table_component(summary):
+    """Table with one row per span: calls, average, p95, max and total time"""
+    if not summary:
+        return ft.Text(
+            "Todavía no hay operaciones medidas.",
+            size=12,
+            color=ft.Colors.GREY_600,
+        )
+
+    rows = sorted(summary.items(), key=lambda item: item[1]["sum"], reverse=True)
+    return ft.DataTable(
+        columns=[
+            ft.DataColumn(ft.Text("Operación")),
+            ft.DataColumn(ft.Text("Llamadas"), numeric=True),
+            ft.DataColumn(ft.Text("Media"), numeric=True),
+            ft.DataColumn(ft.Text("p95"), numeric=True),
+            ft.DataColumn(ft.Text("Máx"), numeric=True),
+            ft.DataColumn(ft.Text("Total"), numeric=True),
+        ],
+        rows=[
+            ft.DataRow(
+                cells=[
+                    ft.DataCell(ft.Text(name, size=11, font_family="monospace")),
+                    ft.DataCell(ft.Text(str(stats["count"]), size=11)),
+                    ft.DataCell(ft.Text(_format_seconds(stats["avg"]), size=11)),
+                    ft.DataCell(ft.Text(_format_seconds(stats["p95"]), size=11)),
+                    ft.DataCell(ft.Text(_format_seconds(stats["max"]), size=11)),
+                    ft.DataCell(ft.Text(_format_seconds(stats["sum"]), size=11)),
+                ]
+            )
+            for name, stats in rows
+        ],
+        heading_row_height=32,
+        data_row_min_height=26,
+        data_row_max_height=26,
+        column_spacing=20,
+    )
+
+
+def _format_bytes(value):
+    return f"{value / 1024 / 1024:.1f} MB"
+
+
+def memory_table_component(records, enabled):
+    """Most recent profiled operations: peak, retained and the module retaining the most"""
+    if not enabled:
+        return ft.Text(
+            "Perfilado de memoria desactivado (iniciar con IG_MEMORY_PROFILING=1).",
+            size=12,
+            color=ft.Colors.GREY_600,
+        )
+    if not records:
+        return ft.Text(
+            "Todavía no hay operaciones perfiladas.",
+            size=12,
+            color=ft.Colors.GREY_600,
+        )
+
+    return ft.DataTable(
+        columns=[
+            ft.DataColumn(ft.Text("Operación")),
+            ft.DataColumn(ft.Text("Fin")),
+            ft.DataColumn(ft.Text("Pico"), numeric=True),
+            ft.DataColumn(ft.Text("Retenida"), numeric=True),
+            ft.DataColumn(ft.Text("Módulo principal")),
+        ],
+        rows=[
+            ft.DataRow(
+                cells=[
+                    ft.DataCell(ft.Text(
+                        f"{'⚠️ ' if record['over_budget'] else ''}{record['operation']}",
+                        size=11,
+                        font_family="monospace",
+                    )),
+                    ft.DataCell(ft.Text(record["ended_at"], size=11)),
+                    ft.DataCell(ft.Text(_format_bytes(record["peak_bytes"]), size=11)),
+                    ft.DataCell(ft.Text(_format_bytes(record["retained_bytes"]), size=11)),
+                    ft.DataCell(ft.Text(
+                        record["by_module"][0]["module"] if record["by_module"] else "-",
+                        size=11,
+                    )),
+                ]
+            )
+            for record in reversed(records)
+        ],
+        heading_row_height=32,
+        data_row_min_height=26,
+        data_row_max_height=26,
+        column_spacing=20,
+    )
+
+
+def performance_component(summary, memory_records, memory_enabled, on_refresh, on_export, on_reset):
+    status_text = ft.Text("", size=11, color=ft.Colors.GREY_600)
+
+    return ft.Container(
+        content=ft.Column(
+            [
+                ft.Text(
+                    "⏱️ Rendimiento",
+                    size=20,
+                    weight=ft.FontWeight.BOLD,
+                    color=ft.Colors.BLUE_GREY_800,
+                ),
+                ft.Row(
+                    [
+                        ft.ElevatedButton("🔄 Actualizar", on_click=on_refresh),
+                        ft.ElevatedButton(
+                            "⬇️ JSON",
+                            on_click=lambda e: on_export("json", status_text),
+                        ),
+                        ft.ElevatedButton(
+                            "⬇️ Prometheus",
+                            on_click=lambda e: on_export("prom", status_text),
+                        ),
+                        ft.ElevatedButton(
+                            "🧹 Reiniciar",
+                            on_click=on_reset,
+                            bgcolor=ft.Colors.GREY_500,
+                            color=ft.Colors.WHITE,
+                        ),
+                        status_text,
+                    ],
+                    wrap=True,
+                ),
+                performance_table_component(summary),
+                ft.Text(
+                    "🧠 Memoria",
+                    size=16,
+                    weight=ft.FontWeight.BOLD,
+                    color=ft.Colors.BLUE_GREY_800,
+                ),
+                memory_table_component(memory_records, memory_enabled),
+            ],
+            scroll=ft.ScrollMode.AUTO,
+            spacing=12,
+        ),
+        width=800,
+        height=500,
+        padding=ft.padding.all(20),
+        border_radius=10,
+        bgcolor=ft.Colors.GREY_50,
+        border=ft.border.all(1, ft.Colors.GREY_300),
+    )
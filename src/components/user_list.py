@@ -0,0 +1,238 @@
+import threading
+
+import flet as ft
+
+from config.settings import LIST_PAGE_SIZE, LIST_WINDOW_PAGES, SEARCH_DEBOUNCE_SECONDS
+from utils.debounce import Debouncer
+from utils.helpers import get_list_page
+from utils.search_index import get_prefix_index
+from utils.tracing import trace_span
+
+
+def user_list_component(
+    items,
+    empty_text,
+    bg_color,
+    border_color,
+    index_key=None,
+    avatar_for=None,
+    page_size=LIST_PAGE_SIZE,
+    window_pages=LIST_WINDOW_PAGES,
+):
+    """Windowed list of usernames: rows are built and sent one page at a time while scrolling.
+
+    At most window_pages pages are kept in the ListView; pages scrolled far out
+    of view are dropped and rebuilt when scrolling back, so the control tree
+    stays bounded for any list size.
+
+    When index_key is given, a debounced search box filters the list through a
+    cached prefix index shared by every view showing the same list.
+    avatar_for(username, on_ready) returns a cached image path for the row, or
+    None and calls on_ready(path) once the image is downloaded;
+    avatar_for.release(username, on_ready) is called for rows dropped before that.
+    """
+    if not items:
+        return ft.Container(
+            content=ft.Text(empty_text, size=11, color=ft.Colors.BLACK87),
+            padding=ft.padding.all(15),
+            bgcolor=bg_color,
+            border_radius=8,
+            border=ft.border.all(1, border_color),
+            height=300,
+        )
+
+    item_extent = 22 if avatar_for else 18  # Altura fija: el cliente solo dibuja las filas visibles
+    list_view = ft.ListView(
+        controls=[],
+        item_extent=item_extent,
+        spacing=0,
+        expand=True,
+    )
+    max_rows = page_size * window_pages
+    current_items = items
+    # Filas cargadas: current_items[window_start:window_end]
+    window_start = 0
+    window_end = 0
+    # La búsqueda corre en el hilo del Debouncer y el scroll en el de eventos: ambos cambian la ventana
+    lock = threading.RLock()
+    search_generation = 0
+
+    def build_rows(start, stop) -> list:
+        rows = get_list_page(current_items, start, stop - start)
+        if avatar_for:
+            return [
+                user_row_component(row, username, avatar_for)
+                for row, username in zip(rows, current_items[start:stop])
+            ]
+        return [ft.Text(row, size=11, color=ft.Colors.BLACK87, selectable=True) for row in rows]
+
+    def drop_rows(rows):
+        # Las filas que esperaban su foto ya no la necesitan
+        if avatar_for:
+            for row in rows:
+                if row.data:
+                    avatar_for.release(*row.data)
+
+    def load_next_page() -> int:
+        """Append a page; returns how many rows were dropped from the top"""
+        nonlocal window_start, window_end
+        rows = build_rows(window_end, min(window_end + page_size, len(current_items)))
+        list_view.controls.extend(rows)
+        window_end += len(rows)
+        overflow = len(list_view.controls) - max_rows
+        if overflow <= 0:
+            return 0
+        drop_rows(list_view.controls[:overflow])
+        del list_view.controls[:overflow]
+        window_start += overflow
+        return overflow
+
+    def load_previous_page() -> int:
+        """Prepend a page; returns how many rows were added on top"""
+        nonlocal window_start, window_end
+        start = max(0, window_start - page_size)
+        rows = build_rows(start, window_start)
+        list_view.controls[0:0] = rows
+        window_start = start
+        overflow = len(list_view.controls) - max_rows
+        if overflow > 0:
+            drop_rows(list_view.controls[-overflow:])
+            del list_view.controls[-overflow:]
+            window_end -= overflow
+        return len(rows)
+
+    def show_items(new_items):
+        nonlocal current_items, window_start, window_end
+        current_items = new_items
+        window_start = window_end = 0
+        drop_rows(list_view.controls)
+        list_view.controls.clear()
+        load_next_page()
+        if not new_items:
+            list_view.controls.append(
+                ft.Text("Sin resultados", size=11, color=ft.Colors.GREY_600)
+            )
+
+    def on_scroll(e):
+        with lock:
+            # Cerca del final: siguiente página (y se descartan filas de arriba)
+            if window_end < len(current_items) and e.pixels >= e.max_scroll_extent - 200:
+                removed = load_next_page()
+                list_view.update()
+                if removed:
+                    # Mantener a la vista las mismas filas tras quitar las de arriba
+                    list_view.scroll_to(offset=e.pixels - removed * item_extent, duration=0)
+            # Cerca del principio con filas descartadas: volver a cargar la página anterior
+            elif window_start > 0 and e.pixels <= 200:
+                added = load_previous_page()
+                list_view.update()
+                list_view.scroll_to(offset=e.pixels + added * item_extent, duration=0)
+
+    list_view.on_scroll = on_scroll
+    load_next_page()
+
+    content = list_view
+    if index_key is not None:
+        def on_query_change(query):
+            nonlocal search_generation
+            with lock:
+                search_generation += 1
+                generation = search_generation
+            debounced_search(query, generation)
+
+        def run_search(query, generation):
+            index = get_prefix_index(index_key, items)
+            results = index.search(query) if query.strip() else items
+            with lock:
+                # Se escribió otra vez mientras se buscaba: este resultado ya no vale
+                if generation != search_generation:
+                    return
+                show_items(results)
+                list_view.update()
+
+        debounced_search = Debouncer(SEARCH_DEBOUNCE_SECONDS, run_search)
+        # Construir el índice en segundo plano para que la primera búsqueda ya lo encuentre
+        threading.Thread(target=get_prefix_index, args=(index_key, items), daemon=True).start()
+        content = ft.Column(
+            [
+                ft.TextField(
+                    hint_text="Buscar usuario...",
+                    prefix_icon=ft.Icons.SEARCH,
+                    height=36,
+                    text_size=12,
+                    content_padding=ft.padding.symmetric(horizontal=8),
+                    on_change=lambda e: on_query_change(e.control.value),
+                ),
+                list_view,
+            ],
+            spacing=8,
+        )
+
+    return ft.Container(
+        content=content,
+        padding=ft.padding.all(15),
+        bgcolor=bg_color,
+        border_radius=8,
+        border=ft.border.all(1, border_color),
+        height=300,
+    )
+
+
+def user_row_component(text, username, avatar_for):
+    avatar = ft.CircleAvatar(bgcolor=ft.Colors.GREY_300, radius=9)
+
+    def show_avatar(path):
+        row.data = None
+        avatar.foreground_image_src = path
+        if avatar.page:  # La fila puede haberse descartado (búsqueda, otra comparación)
+            avatar.update()
+
+    row = ft.Row(
+        [
+            avatar,
+            ft.Text(text, size=11, color=ft.Colors.BLACK87, selectable=True),
+        ],
+        spacing=6,
+    )
+    cached = avatar_for(username, show_avatar)
+    if cached:
+        avatar.foreground_image_src = cached
+    else:
+        # Pendiente de descarga: la lista lo libera si descarta la fila
+        row.data = (username, show_avatar)
+    return row
+
+
+def lazy_tabs_component(tab_specs, height=350):
+    """Tabs whose bodies are built on first selection and then reused.
+
+    tab_specs is a list of (text, builder) pairs. Returns the Tabs control and
+    a function that builds the selected tab; call it after the first paint.
+    """
+    built = set()
+
+    def placeholder():
+        return ft.Container(
+            content=ft.Text("⏳ Cargando lista...", size=11, color=ft.Colors.GREY_600),
+            padding=ft.padding.all(15),
+            height=300,
+        )
+
+    tabs = ft.Tabs(
+        selected_index=0,
+        animation_duration=300,
+        tabs=[ft.Tab(text=text, content=placeholder()) for text, _ in tab_specs],
+        height=height,
+    )
+
+    def build_selected_tab():
+        index = tabs.selected_index or 0
+        if index in built:
+            return
+        built.add(index)
+        with trace_span("ui.build_tab"):
+            tabs.tabs[index].content = tab_specs[index][1]()
+            tabs.update()
+
+    tabs.on_change = lambda e: build_selected_tab()
+    return tabs, build_selected_tab
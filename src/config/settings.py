@@ -1,16 +1,207 @@
+import atexit
+import contextvars
+import json
 import logging
+import os
+import queue
+from contextlib import contextmanager
 from pathlib import Path
 
 
-def setup_logger(logs_dir: Path) -> logging.Logger:
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(levelname)s - %(message)s",
-        handlers=[
-            logging.FileHandler(
-                logs_dir / "instagram_extractor.log", encoding="utf-8"
-            )
-        ],
+# =====================| Logging |=====================
+# Formato del archivo de log: "text" o "json" (una línea JSON por registro)
+LOG_FORMAT = os.environ.get("IG_LOG_FORMAT", "text")
+
+# Rotación: "size" (LOG_MAX_BYTES por archivo) o "time" (cada LOG_ROTATE_WHEN)
+LOG_ROTATION = os.environ.get("IG_LOG_ROTATION", "size")
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_ROTATE_WHEN = "midnight"
+LOG_BACKUP_COUNT = 5
+
+# Campos de contexto que se añaden a cada registro cuando están definidos
+LOG_CONTEXT_FIELDS = ("job_id", "account", "duration_ms")
+
+_log_context = contextvars.ContextVar("log_context", default={})
+_log_listener = None
+
+
+@contextmanager
+def log_context(**fields):
+    """Attach fields (job_id, account...) to every record logged inside the block"""
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+class LogContextFilter(logging.Filter):
+    """Copy the current log_context onto the record on the calling thread"""
+
+    def filter(self, record):
+        for name, value in _log_context.get().items():
+            if not hasattr(record, name):
+                setattr(record, name, value)
+        return True
+
+
+class JsonLogFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for name in LOG_CONTEXT_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                entry[name] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _file_handler(log_path) -> logging.Handler:
+    import logging.handlers  # Arrastra socket; solo hace falta al configurar el log
+
+    if LOG_ROTATION == "time":
+        return logging.handlers.TimedRotatingFileHandler(
+            log_path, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
+        )
+    return logging.handlers.RotatingFileHandler(
+        log_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
     )
+
+
+def setup_logger(logs_dir: Path) -> logging.Logger:
+    """Log through a queue: callers only enqueue, a listener thread writes the rotating file"""
+    import logging.handlers
+
+    global _log_listener
     logger = logging.getLogger(__name__)
+    if _log_listener is not None:
+        return logger
+
+    file_handler = _file_handler(logs_dir / "instagram_extractor.log")
+    if LOG_FORMAT == "json":
+        file_handler.setFormatter(JsonLogFormatter())
+    else:
+        file_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(LogContextFilter())
+
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(queue_handler)
+
+    _log_listener = logging.handlers.QueueListener(log_queue, file_handler)
+    _log_listener.start()
+    # Vaciar la cola al salir para no perder los últimos registros
+    atexit.register(_log_listener.stop)
     return logger
+
+
+# =====================| Snapshot cache |=====================
+# Presupuesto de memoria del cache de snapshots (bytes estimados de las listas ya cargadas, ~3-4x el JSON)
+SNAPSHOT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+# =====================| Extraction |=====================
+# Usuarios por página al paginar seguidores/seguidos
+EXTRACTION_PAGE_SIZE = 200
+
+# Pausa entre la lista de seguidores y la de seguidos
+EXTRACTION_PAUSE_SECONDS = 5
+
+# Reintentos de una página que falla (límite de peticiones, corte de conexión)
+EXTRACTION_MAX_RETRIES = 3
+EXTRACTION_RETRY_BACKOFF_SECONDS = 2
+
+# Alertas de cambios calculadas durante la extracción (clave de "stats" -> umbral)
+CHANGE_ALERT_THRESHOLDS = {
+    "followers_lost": 50,
+    "followers_gained": 500,
+    "unfollowed_count": 50,
+}
+
+
+# =====================| UI |=====================
+# Filas que se envían al cliente por cada página de las listas
+LIST_PAGE_SIZE = 100
+
+# Páginas que una lista mantiene cargadas; las que quedan lejos del scroll se descartan
+LIST_WINDOW_PAGES = 5
+
+# Espera (segundos) antes de ejecutar una búsqueda mientras se escribe
+SEARCH_DEBOUNCE_SECONDS = 0.2
+
+# Hilos para cargar y comparar archivos sin bloquear la interfaz
+UI_WORKER_THREADS = 2
+
+
+# =====================| Prefetch |=====================
+# Tamaño máximo (bytes) de un snapshot para precargarlo en segundo plano
+PREFETCH_MAX_BYTES = 200 * 1024 * 1024
+# Cada cuánto (segundos) revisa la cancelación quien espera una comparación precalculada
+PREFETCH_WAIT_POLL_SECONDS = 0.1
+
+
+# =====================| Thumbnails |=====================
+# Presupuesto en disco del cache de fotos de perfil
+THUMBNAIL_CACHE_MAX_BYTES = 64 * 1024 * 1024
+THUMBNAIL_SIZE = 64
+THUMBNAIL_FETCH_WORKERS = 4
+# Descargas de miniaturas en espera; al superarlo se descartan las pedidas hace más tiempo
+THUMBNAIL_MAX_QUEUED = 256
+
+# Espera antes de guardar el índice de miniaturas: varias descargas seguidas se guardan juntas
+THUMBNAIL_INDEX_SAVE_DELAY_SECONDS = 2
+
+# Metadata (.meta) de snapshots que se mantiene parseada en memoria
+SNAPSHOT_METADATA_CACHE_SIZE = 8
+
+
+# =====================| Memory profiling |=====================
+# Perfilado con tracemalloc (lento): activar con IG_MEMORY_PROFILING=1
+MEMORY_PROFILING = os.environ.get("IG_MEMORY_PROFILING", "0") == "1"
+
+# Pico de memoria (bytes) por operación a partir del cual se avisa
+MEMORY_BUDGET_BYTES = int(os.environ.get("IG_MEMORY_BUDGET_BYTES", 1024 * 1024 * 1024))
+
+# Módulos con más memoria retenida que se guardan por operación
+MEMORY_PROFILE_TOP_MODULES = 10
+
+
+# =====================| HTTP API |=====================
+API_HOST = "127.0.0.1"
+API_PORT = 8000
+
+# Hilos para cargar y comparar snapshots fuera del event loop
+API_WORKER_THREADS = 4
+
+# Tamaño de página por defecto y máximo de las listas de usuarios
+API_PAGE_SIZE = 100
+API_MAX_PAGE_SIZE = 5000
+
+# Segundos tras los que la API vuelve a leer el catálogo (snapshots escritos por otros procesos)
+API_CATALOG_REFRESH_SECONDS = 10
+
+
+# =====================| Compaction |=====================
+# Retención por antigüedad: todo 7 días, uno por día hasta 90 días, uno por semana después
+RETENTION_TIERS = [
+    {"max_age_days": 7, "keep": "all"},
+    {"max_age_days": 90, "keep": "daily"},
+    {"max_age_days": None, "keep": "weekly"},
+]
+
+# Compactación automática en segundo plano desde la app (borra snapshots): IG_COMPACTION=1
+COMPACTION_ENABLED = os.environ.get("IG_COMPACTION", "0") == "1"
+COMPACTION_INTERVAL_HOURS = 24
+
+# Límite de lectura/borrado de la compactación (bytes por segundo)
+COMPACTION_MAX_BYTES_PER_SECOND = 20 * 1024 * 1024
@@ -0,0 +1,106 @@
+import threading
+import time
+from pathlib import Path
+
+from utils.helpers import describe_snapshot_file, iter_all_snapshot_files
+from utils.search_index import PrefixIndex
+
+
+class AccountCatalog:
+    """In-memory catalog of accounts and their snapshot files.
+
+    Loaded with a single directory scan and kept current through
+    ``register_snapshot``, so account autocomplete and the file selectors
+    never touch the disk while typing. Other processes writing snapshots
+    are picked up with ``refresh_if_stale``.
+    """
+
+    def __init__(self, data_dir, logger):
+        self.data_dir = data_dir
+        self.logger = logger
+        self.files = {}
+        self._index = PrefixIndex([])
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self.loaded_at = 0.0
+
+    def load(self):
+        files = {}
+        for account, file_path in iter_all_snapshot_files(self.data_dir):
+            files.setdefault(account, []).append(describe_snapshot_file(file_path, account))
+
+        for account_files in files.values():
+            account_files.sort(key=lambda x: x['timestamp'], reverse=True)
+
+        with self._lock:
+            self.files = files
+            self._index = PrefixIndex(files)
+        self.loaded_at = time.monotonic()
+        self.logger.info(f"Catálogo de cuentas cargado: {len(files)} cuentas")
+        return self
+
+    def refresh_if_stale(self, max_age_seconds):
+        """Rescan data_dir if the last scan is older than max_age_seconds"""
+        if time.monotonic() - self.loaded_at < max_age_seconds:
+            return self
+        # Si otro hilo ya está releyendo, se sirve la versión actual
+        if self._refresh_lock.acquire(blocking=False):
+            try:
+                if time.monotonic() - self.loaded_at >= max_age_seconds:
+                    self.load()
+            finally:
+                self._refresh_lock.release()
+        return self
+
+    def register_snapshot(self, file_path):
+        """Add a newly written snapshot to the catalog"""
+        account = Path(file_path).name.rsplit("_data_", 1)[0]
+        file_info = describe_snapshot_file(file_path, account)
+        with self._lock:
+            account_files = self.files.setdefault(account, [])
+            if any(info['path'] == file_info['path'] for info in account_files):
+                return
+            account_files.append(file_info)
+            account_files.sort(key=lambda x: x['timestamp'], reverse=True)
+            if len(account_files) == 1:
+                self._index = PrefixIndex(self.files)
+
+    def accounts(self) -> list:
+        with self._lock:
+            return sorted(self.files)
+
+    def suggest(self, prefix, limit=8) -> list:
+        """Account names starting with prefix"""
+        with self._lock:
+            index = self._index
+        return index.search(prefix)[:limit] if prefix.strip() else []
+
+    def files_for(self, account_name) -> list:
+        """Snapshot file infos of an account, most recent first"""
+        with self._lock:
+            return list(self.files.get(account_name, []))
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_account_catalog(data_dir, logger) -> AccountCatalog:
+    """Process-wide catalog, loaded on first use"""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = AccountCatalog(data_dir, logger).load()
+        return _catalog
+
+
+def register_snapshot(file_path):
+    """Keep the catalog current after a snapshot is written (no-op if it is not loaded)"""
+    if _catalog is not None:
+        _catalog.register_snapshot(file_path)
+
+
+def reload_catalog():
+    """Rescan data_dir after files were removed (no-op if the catalog is not loaded)"""
+    if _catalog is not None:
+        _catalog.load()
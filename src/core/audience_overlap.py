@@ -0,0 +1,124 @@
+from itertools import combinations
+
+from core.instagram_comparator import InstagramComparator
+
+
+def _popcount(bitmap) -> int:
+    try:
+        return bitmap.bit_count()
+    except AttributeError:  # Python < 3.10
+        return bin(bitmap).count("1")
+
+
+class UsernameRegistry:
+    """Global username -> dense integer id space shared by every account"""
+
+    def __init__(self):
+        self.ids = {}
+        self.usernames = []
+
+    def id_for(self, username) -> int:
+        user_id = self.ids.get(username)
+        if user_id is None:
+            user_id = len(self.usernames)
+            self.ids[username] = user_id
+            self.usernames.append(username)
+        return user_id
+
+    def encode(self, usernames) -> int:
+        """Encode a set of usernames as a bitmap (bit i set <=> user id i present)"""
+        ids = [self.id_for(username) for username in usernames]
+        if not ids:
+            return 0
+        buffer = bytearray(max(ids) // 8 + 1)
+        for user_id in ids:
+            buffer[user_id >> 3] |= 1 << (user_id & 7)
+        return int.from_bytes(buffer, 'little')
+
+    def decode(self, bitmap) -> list:
+        usernames = []
+        data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')
+        for byte_index, byte in enumerate(data):
+            while byte:
+                low_bit = byte & -byte
+                usernames.append(self.usernames[(byte_index << 3) + low_bit.bit_length() - 1])
+                byte ^= low_bit
+        return usernames
+
+
+class AudienceOverlapAnalyzer:
+    """Cross-account follower overlap over bitmaps of the latest snapshot per account.
+
+    Ids are assigned densely in first-seen order, so each follower set is a
+    bitmap over a compact id space and intersections/unions are a single
+    bitwise operation. Bitmaps are cached per snapshot file, so refreshing
+    after a snapshot round only re-encodes the accounts that changed.
+    """
+
+    def __init__(self, data_dir, logger):
+        self.data_dir = data_dir
+        self.logger = logger
+        self.comparator = InstagramComparator(data_dir, logger)
+        self.registry = UsernameRegistry()
+        self.bitmaps = {}
+        self._sources = {}
+
+    def refresh(self, accounts=None) -> dict:
+        """Encode the latest follower set of each account (all tracked accounts by default)"""
+        accounts = accounts or self.comparator.list_accounts()
+        for account in accounts:
+            files = self.comparator.find_account_files(account)
+            if not files:
+                continue
+            latest = files[-1]
+            if self._sources.get(account) == latest:
+                continue
+
+            data = self.comparator.load_data(latest)
+            if not data:
+                continue
+            self.bitmaps[account] = self.registry.encode(data.get('followers', []))
+            self._sources[account] = latest
+
+        self.logger.info(f"Bitmaps de audiencia listos para {len(self.bitmaps)} cuentas")
+        return self.bitmaps
+
+    def follower_count(self, account) -> int:
+        return _popcount(self.bitmaps[account])
+
+    def pair_overlap(self, account1, account2) -> dict:
+        bitmap1 = self.bitmaps[account1]
+        bitmap2 = self.bitmaps[account2]
+        intersection = _popcount(bitmap1 & bitmap2)
+        union = _popcount(bitmap1 | bitmap2)
+        return {
+            'intersection': intersection,
+            'union': union,
+            'jaccard': intersection / union if union else 0.0,
+        }
+
+    def overlap_matrix(self) -> dict:
+        """Pairwise intersection/union/Jaccard for every tracked account"""
+        matrix = {}
+        for account1, account2 in combinations(sorted(self.bitmaps), 2):
+            matrix[(account1, account2)] = self.pair_overlap(account1, account2)
+        return matrix
+
+    def shared_followers(self, account1, account2) -> list:
+        return sorted(self.registry.decode(self.bitmaps[account1] & self.bitmaps[account2]))
+
+    def shared_by_at_least(self, k, accounts=None) -> list:
+        """Followers present in at least k of the given accounts"""
+        accounts = accounts or sorted(self.bitmaps)
+        if k <= 0 or k > len(accounts):
+            return []
+
+        # levels[j] = usuarios presentes en al menos j+1 cuentas
+        levels = [0] * k
+        for account in accounts:
+            bitmap = self.bitmaps[account]
+            for j in range(k - 1, 0, -1):
+                levels[j] |= levels[j - 1] & bitmap
+            levels[0] |= bitmap
+
+        return sorted(self.registry.decode(levels[k - 1]))
@@ -0,0 +1,98 @@
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+from core.instagram_comparator import InstagramComparator
+
+
+def compare_latest_pair(data_dir, account) -> dict:
+    """Compare the two most recent snapshots of an account (runs in a worker process)"""
+    logger = logging.getLogger(__name__)
+    started = time.perf_counter()
+    result = {'account': account, 'file1': None, 'file2': None, 'stats': None, 'error': None}
+
+    comparator = InstagramComparator(Path(data_dir), logger)
+    files = comparator.find_account_files(account)
+    if len(files) < 2:
+        result['error'] = "Se necesitan al menos dos snapshots"
+    else:
+        result['file1'] = Path(files[-2]).name
+        result['file2'] = Path(files[-1]).name
+        comparison = comparator.compare_data(files[-2], files[-1])
+        if comparison:
+            result['stats'] = comparison['stats']
+        else:
+            result['error'] = "Error al comparar los archivos"
+
+    result['seconds'] = round(time.perf_counter() - started, 4)
+    return result
+
+
+def run_batch_comparison(data_dir, logger, accounts=None, max_workers=None) -> dict:
+    """Compare latest vs previous snapshot for every account in parallel and write a summary report"""
+    data_dir = Path(data_dir)
+    started = time.perf_counter()
+    accounts = accounts or InstagramComparator(data_dir, logger).list_accounts()
+    max_workers = max_workers or os.cpu_count() or 1
+
+    logger.info(f"Comparación en lote de {len(accounts)} cuentas con {max_workers} procesos")
+
+    results = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(compare_latest_pair, str(data_dir), account): account
+            for account in accounts
+        }
+        for future in as_completed(futures):
+            account = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'account': account, 'stats': None, 'error': str(e), 'seconds': None}
+            if result['error']:
+                logger.warning(f"@{account}: {result['error']}")
+            else:
+                logger.info(f"@{account} comparado en {result['seconds']}s")
+            results.append(result)
+
+    results.sort(key=lambda r: r['account'])
+    timestamp = datetime.now()
+    report = {
+        'generated_at': timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+        'workers': max_workers,
+        'total_seconds': round(time.perf_counter() - started, 4),
+        'accounts': results,
+    }
+
+    reports_dir = data_dir / ".reports"
+    reports_dir.mkdir(exist_ok=True)
+    report_path = reports_dir / f"batch_summary_{timestamp.strftime('%Y%m%d%H%M')}.json"
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    logger.info(f"Reporte de comparación en lote guardado en: {report_path}")
+    report['report_path'] = str(report_path)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara el último par de snapshots de cada cuenta")
+    parser.add_argument("--data-dir", default=str(Path(__file__).resolve().parents[1] / "instagram_data"))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("accounts", nargs="*")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    report = run_batch_comparison(
+        args.data_dir, logging.getLogger(__name__), args.accounts or None, args.workers
+    )
+    print(report['report_path'])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import json
+from pathlib import Path
+
+from config.settings import CHANGE_ALERT_THRESHOLDS
+from core.instagram_comparator import build_comparison_report
+from utils.helpers import snapshot_sidecar_path
+
+
+class ChangeTracker:
+    """Incremental diff of a snapshot being extracted against the previous one.
+
+    Pages are fed as they arrive; gains are counted on the fly so alerts on
+    them fire mid-extraction, while losses are only known once a list is
+    complete. ``finalize`` returns a report with the same shape as
+    ``InstagramComparator.compare_data``, built from the final lists.
+    """
+
+    def __init__(self, previous_file, previous_data, logger, thresholds=None, on_alert=None):
+        self.previous_file = previous_file
+        self.previous_data = previous_data
+        self.logger = logger
+        self.thresholds = CHANGE_ALERT_THRESHOLDS if thresholds is None else thresholds
+        self.on_alert = on_alert
+        self.previous = {
+            'followers': set(previous_data.get('followers', [])),
+            'following': set(previous_data.get('following', [])),
+        }
+        self.current = {'followers': set(), 'following': set()}
+        self.running_stats = {'followers_gained': 0, 'new_following_count': 0}
+        self.fired_alerts = set()
+        self.alerts = []
+
+    def add_page(self, relation, usernames):
+        previous = self.previous[relation]
+        current = self.current[relation]
+        new_count = 0
+        for username in usernames:
+            if username not in current:
+                current.add(username)
+                if username not in previous:
+                    new_count += 1
+
+        stat = 'followers_gained' if relation == 'followers' else 'new_following_count'
+        self.running_stats[stat] += new_count
+        self._check_alert(stat, self.running_stats[stat])
+
+    def finish_relation(self, relation, usernames):
+        """Called with the list actually returned: losses are now final"""
+        self.current[relation] = set(usernames)
+        lost = len(self.previous[relation] - self.current[relation])
+        self._check_alert('followers_lost' if relation == 'followers' else 'unfollowed_count', lost)
+
+    def _check_alert(self, stat, value):
+        threshold = self.thresholds.get(stat)
+        if threshold is None or value < threshold or stat in self.fired_alerts:
+            return
+
+        self.fired_alerts.add(stat)
+        alert = {'stat': stat, 'value': value, 'threshold': threshold}
+        self.alerts.append(alert)
+        self.logger.warning(f"⚠️ Alerta: {stat} = {value} (umbral {threshold})")
+        if self.on_alert:
+            try:
+                self.on_alert(alert)
+            except Exception as e:
+                self.logger.error(f"Error en callback de alerta: {e}")
+
+    def finalize(self, account_name, filename, extraction_date) -> dict:
+        comparison = build_comparison_report(
+            account_name,
+            {
+                'filename': Path(self.previous_file).name,
+                'date': self.previous_data.get('extraction_date', 'No disponible'),
+            },
+            {'filename': filename, 'date': extraction_date},
+            self.previous['followers'],
+            self.previous['following'],
+            self.current['followers'],
+            self.current['following'],
+        )
+        comparison['alerts'] = self.alerts
+        return comparison
+
+
+def write_change_record(snapshot_path, comparison) -> Path:
+    """Persist a change record next to its snapshot"""
+    changes_path = snapshot_sidecar_path(snapshot_path, "changes")
+    with open(changes_path, 'w', encoding='utf-8') as f:
+        json.dump(comparison, f, ensure_ascii=False)
+    return changes_path
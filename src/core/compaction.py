@@ -0,0 +1,226 @@
+import argparse
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from config.settings import (
+    COMPACTION_INTERVAL_HOURS,
+    COMPACTION_MAX_BYTES_PER_SECOND,
+    RETENTION_TIERS,
+)
+from core.account_catalog import reload_catalog
+from core.instagram_comparator import InstagramComparator
+from core.membership_index import MembershipIndex
+from utils.helpers import snapshot_sidecar_path, snapshot_timestamp
+from utils.snapshot_cache import is_unchanged_marker, resolve_snapshot_path, snapshot_cache
+
+SIDECAR_KINDS = ("changes", "meta", "sketch")
+
+
+class BandwidthLimiter:
+    """Sleep as needed so that consumed bytes stay under bytes_per_second"""
+
+    def __init__(self, bytes_per_second):
+        self.bytes_per_second = bytes_per_second
+        self._started = time.monotonic()
+        self._consumed = 0
+
+    def consume(self, size):
+        if not self.bytes_per_second:
+            return
+        self._consumed += size
+        ahead = self._consumed / self.bytes_per_second - (time.monotonic() - self._started)
+        if ahead > 0:
+            time.sleep(ahead)
+
+    def consume_file(self, file_path):
+        try:
+            self.consume(Path(file_path).stat().st_size)
+        except OSError:
+            pass
+
+
+def retention_bucket(taken_at, now, tiers):
+    """Bucket a snapshot falls into: snapshots sharing a bucket are thinned to the newest"""
+    age_days = (now - taken_at).total_seconds() / 86400
+    for tier in tiers:
+        if tier["max_age_days"] is None or age_days < tier["max_age_days"]:
+            keep = tier["keep"]
+            break
+    else:
+        return None  # Fuera de todos los niveles: se conserva
+
+    if keep == "all":
+        return None
+    if keep == "daily":
+        return ("daily", taken_at.date().isoformat())
+    if keep == "weekly":
+        year, week, _ = taken_at.isocalendar()
+        return ("weekly", f"{year}-W{week:02d}")
+    raise ValueError(f"Nivel de retención desconocido: {keep}")
+
+
+def plan_account(account, files, now, tiers) -> dict:
+    """Split an account's snapshot files (oldest first) into keep / remove lists"""
+    newest_in_bucket = {}
+    keep = set()
+    for file_path in files:
+        timestamp = snapshot_timestamp(file_path, account)
+        if not timestamp:
+            keep.add(file_path)
+            continue
+        bucket = retention_bucket(datetime.strptime(timestamp, "%Y%m%d%H%M"), now, tiers)
+        if bucket is None:
+            keep.add(file_path)
+        else:
+            newest_in_bucket[bucket] = file_path  # files va en orden cronológico
+    keep.update(newest_in_bucket.values())
+    if files:
+        keep.add(files[-1])  # Nunca se borra el último snapshot
+
+    # Un marcador conservado necesita el snapshot completo al que apunta
+    kept_for_markers = set()
+    for file_path in list(keep):
+        if is_unchanged_marker(file_path):
+            base_path = str(resolve_snapshot_path(file_path))
+            if base_path not in keep:
+                kept_for_markers.add(base_path)
+    keep |= kept_for_markers
+
+    return {
+        'keep': [file_path for file_path in files if file_path in keep],
+        'remove': [file_path for file_path in files if file_path not in keep],
+        'kept_for_markers': sorted(kept_for_markers),
+    }
+
+
+def remove_snapshot(file_path, limiter) -> int:
+    """Delete a snapshot and its sidecars; returns the bytes freed"""
+    freed = 0
+    for path in [Path(file_path), *(snapshot_sidecar_path(file_path, kind) for kind in SIDECAR_KINDS)]:
+        if not path.exists():
+            continue
+        size = path.stat().st_size
+        limiter.consume(size)
+        path.unlink()
+        freed += size
+    snapshot_cache.invalidate(file_path)
+    return freed
+
+
+def prune_empty_dirs(account_dir):
+    """Remove month/year folders of an account left empty after deleting snapshots"""
+    for month_dir in sorted(Path(account_dir).glob("*/*"), reverse=True):
+        for directory in (month_dir, month_dir.parent):
+            try:
+                directory.rmdir()
+            except OSError:
+                pass  # No está vacía
+
+
+def run_compaction(data_dir, logger, tiers=None, accounts=None, dry_run=False,
+                   max_bytes_per_second=COMPACTION_MAX_BYTES_PER_SECOND, now=None) -> dict:
+    """Thin every account's history according to the retention tiers and write a manifest"""
+    data_dir = Path(data_dir)
+    tiers = tiers or RETENTION_TIERS
+    now = now or datetime.now()
+    started = time.perf_counter()
+    limiter = BandwidthLimiter(max_bytes_per_second)
+    comparator = InstagramComparator(data_dir, logger)
+    accounts = accounts or comparator.list_accounts()
+
+    logger.info(f"Compactación de {len(accounts)} cuentas{' (simulación)' if dry_run else ''}")
+
+    results = {}
+    for account in accounts:
+        plan = plan_account(account, comparator.find_account_files(account), now, tiers)
+        freed = 0
+        if not dry_run:
+            for file_path in plan['remove']:
+                try:
+                    freed += remove_snapshot(file_path, limiter)
+                except OSError as e:
+                    logger.warning(f"No se pudo borrar {file_path}: {e}")
+            if plan['remove']:
+                prune_empty_dirs(data_dir / account)
+
+        results[account] = {
+            'kept': len(plan['keep']),
+            'removed': [Path(file_path).name for file_path in plan['remove']],
+            'kept_for_markers': [Path(file_path).name for file_path in plan['kept_for_markers']],
+            'bytes_freed': freed,
+        }
+        if plan['remove']:
+            logger.info(f"@{account}: {len(plan['remove'])} snapshots eliminados, {len(plan['keep'])} conservados")
+
+        # El índice de membresía se rehace con los snapshots que quedan
+        if plan['remove'] and not dry_run:
+            index = MembershipIndex(data_dir, account, logger)
+            index.sync(before_load=limiter.consume_file)
+            index.save()
+
+    if not dry_run:
+        reload_catalog()
+
+    timestamp = datetime.now()
+    manifest = {
+        'generated_at': timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+        'dry_run': dry_run,
+        'tiers': tiers,
+        'total_removed': sum(len(result['removed']) for result in results.values()),
+        'total_bytes_freed': sum(result['bytes_freed'] for result in results.values()),
+        'total_seconds': round(time.perf_counter() - started, 4),
+        'accounts': results,
+    }
+
+    reports_dir = data_dir / ".reports"
+    reports_dir.mkdir(exist_ok=True)
+    manifest_path = reports_dir / f"compaction_{timestamp.strftime('%Y%m%d%H%M%S')}.json"
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    logger.info(f"Manifiesto de compactación guardado en: {manifest_path}")
+    manifest['manifest_path'] = str(manifest_path)
+    return manifest
+
+
+def start_background_compaction(data_dir, logger, interval_hours=COMPACTION_INTERVAL_HOURS) -> threading.Event:
+    """Run the compaction now and then every interval_hours on a daemon thread; set the event to stop"""
+    stop = threading.Event()
+
+    def loop():
+        while not stop.is_set():
+            try:
+                run_compaction(data_dir, logger)
+            except Exception as e:
+                logger.error(f"Error en la compactación: {e}")
+            stop.wait(interval_hours * 3600)
+
+    threading.Thread(target=loop, name="compaction", daemon=True).start()
+    return stop
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reduce el historial de snapshots según los niveles de retención")
+    parser.add_argument("--data-dir", default=str(Path(__file__).resolve().parents[1] / "instagram_data"))
+    parser.add_argument("--dry-run", action="store_true", help="Solo escribe el manifiesto, sin borrar nada")
+    parser.add_argument("--max-mb-per-second", type=float, default=COMPACTION_MAX_BYTES_PER_SECOND / 1024 / 1024)
+    parser.add_argument("accounts", nargs="*")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    manifest = run_compaction(
+        args.data_dir,
+        logging.getLogger(__name__),
+        accounts=args.accounts or None,
+        dry_run=args.dry_run,
+        max_bytes_per_second=int(args.max_mb_per_second * 1024 * 1024),
+    )
+    print(manifest['manifest_path'])
+
+
+if __name__ == "__main__":
+    main()
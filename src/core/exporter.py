@@ -0,0 +1,136 @@
+import argparse
+import csv
+import json
+import logging
+from itertools import islice
+from pathlib import Path
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet es opcional
+    pa = None
+    pq = None
+
+from core.instagram_comparator import InstagramComparator
+from utils.snapshot_cache import snapshot_cache
+
+EXPORT_CHUNK_SIZE = 50_000
+
+SNAPSHOT_FIELDS = ["account", "extraction_date", "relation", "username"]
+COMPARISON_FIELDS = ["account", "file1", "file2", "category", "username"]
+
+
+def available_formats() -> list:
+    formats = ["csv", "jsonl"]
+    if pq is not None:
+        formats.append("parquet")
+    return formats
+
+
+def iter_snapshot_rows(data):
+    for relation in ("followers", "following"):
+        for username in data.get(relation, []):
+            yield {
+                "account": data["account"],
+                "extraction_date": data.get("extraction_date"),
+                "relation": relation,
+                "username": username,
+            }
+
+
+def iter_comparison_rows(comparison):
+    info = comparison["comparison_info"]
+    for group in ("changes", "current_relationships"):
+        for category, usernames in comparison[group].items():
+            for username in usernames:
+                yield {
+                    "account": comparison["account"],
+                    "file1": info["file1"]["filename"],
+                    "file2": info["file2"]["filename"],
+                    "category": category,
+                    "username": username,
+                }
+
+
+def iter_chunks(rows, chunk_size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def write_rows(rows, fields, out_path, fmt, chunk_size=EXPORT_CHUNK_SIZE) -> int:
+    """Stream rows to out_path in chunks; returns the number of rows written"""
+    if fmt not in available_formats():
+        raise ValueError(f"Formato no disponible: {fmt}")
+
+    total = 0
+    if fmt == "csv":
+        with open(out_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            for chunk in iter_chunks(rows, chunk_size):
+                writer.writerows(chunk)
+                total += len(chunk)
+
+    elif fmt == "jsonl":
+        with open(out_path, "w", encoding="utf-8") as f:
+            for chunk in iter_chunks(rows, chunk_size):
+                f.writelines(json.dumps(row, ensure_ascii=False) + "\n" for row in chunk)
+                total += len(chunk)
+
+    elif fmt == "parquet":
+        schema = pa.schema([(field, pa.string()) for field in fields])
+        with pq.ParquetWriter(out_path, schema) as writer:
+            for chunk in iter_chunks(rows, chunk_size):
+                writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+                total += len(chunk)
+
+    return total
+
+
+def export_snapshot(file_path, out_path, fmt="csv") -> int:
+    data = snapshot_cache.get(file_path)
+    return write_rows(iter_snapshot_rows(data), SNAPSHOT_FIELDS, out_path, fmt)
+
+
+def export_comparison(comparison, out_path, fmt="csv") -> int:
+    return write_rows(iter_comparison_rows(comparison), COMPARISON_FIELDS, out_path, fmt)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta snapshots o comparaciones")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    snapshot_parser = subparsers.add_parser("snapshot")
+    snapshot_parser.add_argument("file")
+
+    comparison_parser = subparsers.add_parser("comparison")
+    comparison_parser.add_argument("file1")
+    comparison_parser.add_argument("file2")
+
+    for subparser in (snapshot_parser, comparison_parser):
+        subparser.add_argument("--format", default="csv", choices=available_formats())
+        subparser.add_argument("--output", required=True)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    logger = logging.getLogger(__name__)
+
+    if args.command == "snapshot":
+        total = export_snapshot(args.file, args.output, args.format)
+    else:
+        comparator = InstagramComparator(Path(args.file1).parent, logger)
+        comparison = comparator.compare_data(args.file1, args.file2)
+        if not comparison:
+            raise SystemExit("No se pudo comparar los archivos")
+        total = export_comparison(comparison, args.output, args.format)
+
+    logger.info(f"{total} filas exportadas a {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+import json
+import random
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+
+try:
+    from instagrapi.exceptions import ChallengeRequired, ClientError, PleaseWaitFewMinutes
+except ImportError:  # Permite usar el cliente simulado sin instagrapi instalado
+    class ClientError(Exception):
+        pass
+
+    class PleaseWaitFewMinutes(ClientError):
+        pass
+
+    class ChallengeRequired(ClientError):
+        pass
+
+
+@dataclass
+class FakeUser:
+    pk: str
+    username: str
+    full_name: str
+    is_private: bool
+    profile_pic_url: str
+
+
+@dataclass
+class FakeUserInfo:
+    pk: str
+    username: str
+    full_name: str
+    is_private: bool
+    follower_count: int
+    following_count: int
+
+
+class FakeInstagramClient:
+    """Drop-in simulated instagrapi Client serving synthetic accounts offline.
+
+    accounts maps a username to {"followers": n, "following": m, "is_private": bool}.
+    Every request can be delayed (latency + jitter); rate limits (429), challenges
+    and a one-off mid-stream failure (after fail_after_pages pages) can be injected
+    to exercise the extractor's paging and retries.
+    """
+
+    def __init__(self, accounts, page_size=200, latency=0.0, jitter=0.0,
+                 rate_limit_every=None, challenge_on_request=None,
+                 fail_after_pages=None, seed=0):
+        self.accounts = accounts
+        self.page_size = page_size
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_every = rate_limit_every
+        self.challenge_on_request = challenge_on_request
+        self.fail_after_pages = fail_after_pages
+        self.seed = seed
+        self.request_count = 0
+        self.page_count = 0
+        self.rate_limited_count = 0
+        self._settings = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    # =====================| Simulación |=====================
+    def _request(self):
+        with self._lock:
+            self.request_count += 1
+            request_number = self.request_count
+            delay = self.latency + (self._rng.random() * self.jitter if self.jitter else 0.0)
+
+        if delay:
+            time.sleep(delay)
+        if self.challenge_on_request and request_number == self.challenge_on_request:
+            raise ChallengeRequired("challenge_required")
+        if self.rate_limit_every and request_number % self.rate_limit_every == 0:
+            with self._lock:
+                self.rate_limited_count += 1
+            raise PleaseWaitFewMinutes("429 Too Many Requests: Please wait a few minutes")
+
+    def _account(self, username):
+        if username not in self.accounts:
+            raise ClientError(f"User not found: {username}")
+        return self.accounts[username]
+
+    def _pk_for(self, username) -> str:
+        return str(zlib.crc32(f"{self.seed}:{username}".encode()) + 10**11)
+
+    def _user(self, account, relation, index) -> FakeUser:
+        # Mismo resultado para el mismo índice: las páginas son deterministas
+        username = f"{account}.{relation[:3]}_{index}"
+        return FakeUser(
+            pk=str(zlib.crc32(username.encode()) * 10**6 + index % 10**6),
+            username=username,
+            full_name=f"User {index}",
+            is_private=index % 3 == 0,
+            profile_pic_url=f"https://example.invalid/{username}.jpg",
+        )
+
+    def _username_for_pk(self, user_id):
+        for username in self.accounts:
+            if self._pk_for(username) == str(user_id):
+                return username
+        raise ClientError(f"User not found: {user_id}")
+
+    def _chunk(self, relation, user_id, max_amount=0, max_id=""):
+        account = self._username_for_pk(user_id)
+        total = self._account(account)[relation]
+        start = int(max_id or 0)
+        amount = max_amount or total
+        users = []
+        while len(users) < amount and start < total:
+            if self.fail_after_pages is not None and self.page_count >= self.fail_after_pages:
+                self.fail_after_pages = None
+                raise ClientError("Connection reset by peer")
+            self._request()
+            stop = min(start + self.page_size, total)
+            users.extend(self._user(account, relation, index) for index in range(start, stop))
+            self.page_count += 1
+            start = stop
+        return users, str(start) if start < total else None
+
+    # =====================| API de instagrapi |=====================
+    def login(self, username, password) -> bool:
+        self._request()
+        self._settings = {"username": username}
+        return True
+
+    def load_settings(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            self._settings = json.load(f)
+        return self._settings
+
+    def dump_settings(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self._settings, f)
+        return True
+
+    def user_info_by_username(self, username) -> FakeUserInfo:
+        self._request()
+        account = self._account(username)
+        return FakeUserInfo(
+            pk=self._pk_for(username),
+            username=username,
+            full_name=username.title(),
+            is_private=account.get("is_private", False),
+            follower_count=account["followers"],
+            following_count=account["following"],
+        )
+
+    def user_followers_v1_chunk(self, user_id, max_amount=0, max_id=""):
+        return self._chunk("followers", user_id, max_amount, max_id)
+
+    def user_following_v1_chunk(self, user_id, max_amount=0, max_id=""):
+        return self._chunk("following", user_id, max_amount, max_id)
+
+    def user_followers(self, user_id, amount=0) -> dict:
+        users, _ = self._chunk("followers", user_id, amount)
+        return {user.pk: user for user in users}
+
+    def user_following(self, user_id, amount=0) -> dict:
+        users, _ = self._chunk("following", user_id, amount)
+        return {user.pk: user for user in users}
@@ -0,0 +1,174 @@
+import json
+import os
+import threading
+from array import array
+from collections import OrderedDict
+
+from config.settings import SNAPSHOT_METADATA_CACHE_SIZE
+from utils.helpers import snapshot_sidecar_path
+from utils.snapshot_cache import resolve_snapshot_path
+
+METADATA_COLUMNS = ("pk", "username", "full_name", "is_private", "profile_pic_url")
+RELATIONS = ("followers", "following")
+
+
+class UserTable:
+    """Columnar table of user fields (parallel arrays) for one relation of a snapshot.
+
+    Filters take and return boolean masks so queries are single passes over
+    the columns; ``select`` materializes the matching rows as a new table.
+    """
+
+    def __init__(self, columns=None):
+        columns = columns or {}
+        self.pk = array("q", columns.get("pk", []))
+        self.username = list(columns.get("username", []))
+        self.full_name = list(columns.get("full_name", []))
+        self.is_private = list(columns.get("is_private", []))
+        self.profile_pic_url = list(columns.get("profile_pic_url", []))
+        self._pk_positions = None
+
+    def __len__(self):
+        return len(self.pk)
+
+    def append_user(self, user):
+        # Leer todos los campos antes de añadir, para no dejar una fila a medias
+        pk = int(user.pk)
+        username = user.username
+        full_name = getattr(user, "full_name", None) or ""
+        is_private = getattr(user, "is_private", None)
+        profile_pic_url = getattr(user, "profile_pic_url", None)
+
+        self.pk.append(pk)
+        self.username.append(username)
+        self.full_name.append(full_name)
+        self.is_private.append(is_private)
+        self.profile_pic_url.append(str(profile_pic_url) if profile_pic_url else None)
+        self._pk_positions = None
+
+    def to_dict(self) -> dict:
+        return {name: list(getattr(self, name)) for name in METADATA_COLUMNS}
+
+    # =====================| Filtros |=====================
+    def mask_private(self) -> list:
+        return [value is True for value in self.is_private]
+
+    def mask_usernames(self, usernames) -> list:
+        usernames = set(usernames)
+        return [username in usernames for username in self.username]
+
+    def mask_pks(self, pks) -> list:
+        pks = set(pks)
+        return [pk in pks for pk in self.pk]
+
+    def select(self, mask):
+        table = UserTable()
+        for name in METADATA_COLUMNS:
+            source = getattr(self, name)
+            selected = [value for value, keep in zip(source, mask) if keep]
+            if name == "pk":
+                table.pk = array("q", selected)
+            else:
+                setattr(table, name, selected)
+        return table
+
+    def position_of(self, pk):
+        if self._pk_positions is None:
+            self._pk_positions = {value: position for position, value in enumerate(self.pk)}
+        return self._pk_positions.get(pk)
+
+    def row(self, position) -> dict:
+        return {name: getattr(self, name)[position] for name in METADATA_COLUMNS}
+
+
+def combine_masks(*masks) -> list:
+    return [all(values) for values in zip(*masks)]
+
+
+def write_snapshot_metadata(snapshot_path, tables):
+    """Store the user tables of a snapshot next to it (<snapshot>.meta)"""
+    meta_path = snapshot_sidecar_path(snapshot_path, "meta")
+    tmp_path = meta_path.with_suffix(".meta.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({relation: tables[relation].to_dict() for relation in RELATIONS}, f, ensure_ascii=False)
+    os.replace(tmp_path, meta_path)
+    return meta_path
+
+
+class SnapshotMetadata:
+    """Lazy reader of a snapshot's user tables; the side file is parsed on first access"""
+
+    def __init__(self, snapshot_path):
+        self.path = snapshot_sidecar_path(resolve_snapshot_path(snapshot_path), "meta")
+        self._tables = None
+        self._profile_pic_urls = {}
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def table(self, relation="followers") -> UserTable:
+        if self._tables is None:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            self._tables = {name: UserTable(stored.get(name)) for name in RELATIONS}
+        return self._tables[relation]
+
+    def profile_pic_urls(self, relation="followers") -> dict:
+        """username -> profile picture URL, built once per relation"""
+        if relation not in self._profile_pic_urls:
+            table = self.table(relation)
+            self._profile_pic_urls[relation] = dict(zip(table.username, table.profile_pic_url))
+        return self._profile_pic_urls[relation]
+
+
+_metadata_cache = OrderedDict()
+_metadata_lock = threading.Lock()
+
+
+def get_snapshot_metadata(snapshot_path):
+    """Shared SnapshotMetadata of a snapshot (None without .meta), parsed once per file version"""
+    metadata = SnapshotMetadata(snapshot_path)
+    try:
+        stat = metadata.path.stat()
+    except FileNotFoundError:
+        return None
+
+    key = (str(metadata.path), stat.st_mtime_ns, stat.st_size)
+    with _metadata_lock:
+        if key in _metadata_cache:
+            _metadata_cache.move_to_end(key)
+            return _metadata_cache[key]
+        _metadata_cache[key] = metadata
+        while len(_metadata_cache) > SNAPSHOT_METADATA_CACHE_SIZE:
+            _metadata_cache.popitem(last=False)
+    return metadata
+
+
+# =====================| Consultas |=====================
+def lost_private_followers(old_metadata, comparison) -> UserTable:
+    """Lost followers (from a compare_data report) that are private accounts"""
+    table = old_metadata.table("followers")
+    mask = combine_masks(
+        table.mask_usernames(comparison["changes"]["lost_followers"]),
+        table.mask_private(),
+    )
+    return table.select(mask)
+
+
+def new_followers_by_pk(old_metadata, new_metadata) -> UserTable:
+    """New followers by pk, so a username change does not count as a new follower"""
+    old_pks = old_metadata.table("followers").pk
+    new_table = new_metadata.table("followers")
+    return new_table.select([not keep for keep in new_table.mask_pks(old_pks)])
+
+
+def renamed_users(old_metadata, new_metadata, relation="followers") -> list:
+    """(pk, old_username, new_username) for users whose username changed"""
+    old_table = old_metadata.table(relation)
+    new_table = new_metadata.table(relation)
+    renamed = []
+    for position, pk in enumerate(new_table.pk):
+        old_position = old_table.position_of(pk)
+        if old_position is not None and old_table.username[old_position] != new_table.username[position]:
+            renamed.append((pk, old_table.username[old_position], new_table.username[position]))
+    return renamed
@@ -1,34 +1,137 @@
 import json
+import time
 from pathlib import Path
 
+from config.settings import log_context
+from utils.helpers import find_snapshot_files, iter_all_snapshot_files, snapshot_sidecar_path
+from utils.snapshot_cache import snapshot_cache
+from utils.memory_profiler import memory_profiled
+from utils.tracing import traced
+
+
+@traced("comparator.build_report")
+def build_comparison_report(account_name, file1_info, file2_info, followers1, following1, followers2, following2) -> dict:
+    """Build the comparison report from the follower/following sets of two snapshots"""
+    # Análisis de cambios en seguidores
+    new_followers = followers2 - followers1  # Nuevos seguidores
+    lost_followers = followers1 - followers2  # Seguidores perdidos
+    
+    # Análisis de cambios en seguidos
+    new_following = following2 - following1  # Nuevos seguidos
+    unfollowed = following1 - following2     # Dejó de seguir
+    
+    # Análisis de relaciones actuales (del archivo más reciente)
+    mutual_follows = followers2 & following2  # Se siguen mutuamente
+    follows_but_not_followed = following2 - followers2  # Sigue pero no lo siguen
+    followed_but_not_following = followers2 - following2  # Lo siguen pero no sigue
+    
+    # Crear reporte completo
+    comparison = {
+        "account": account_name,
+        "comparison_info": {
+            "file1": {
+                "filename": file1_info['filename'],
+                "date": file1_info['date'],
+                "followers_count": len(followers1),
+                "following_count": len(following1)
+            },
+            "file2": {
+                "filename": file2_info['filename'],
+                "date": file2_info['date'],
+                "followers_count": len(followers2),
+                "following_count": len(following2)
+            }
+        },
+        "changes": {
+            "new_followers": sorted(list(new_followers)),
+            "lost_followers": sorted(list(lost_followers)),
+            "new_following": sorted(list(new_following)),
+            "unfollowed": sorted(list(unfollowed))
+        },
+        "current_relationships": {
+            "mutual_follows": sorted(list(mutual_follows)),
+            "follows_but_not_followed": sorted(list(follows_but_not_followed)),
+            "followed_but_not_following": sorted(list(followed_but_not_following))
+        },
+        "stats": {
+            "followers_gained": len(new_followers),
+            "followers_lost": len(lost_followers),
+            "net_followers_change": len(new_followers) - len(lost_followers),
+            "new_following_count": len(new_following),
+            "unfollowed_count": len(unfollowed),
+            "net_following_change": len(new_following) - len(unfollowed),
+            "mutual_follows_count": len(mutual_follows),
+            "follows_but_not_followed_count": len(follows_but_not_followed),
+            "followed_but_not_following_count": len(followed_but_not_following)
+        }
+    }
+    
+    return comparison
+
+
 class InstagramComparator:
     def __init__(self, data_dir, logger):
         self.data_dir = data_dir
         self.logger = logger
 
+    @traced("comparator.load_data")
     def load_data(self, filename):
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = snapshot_cache.get(filename)
             self.logger.info(f"Cargado: {filename}")
             return data
         except Exception as e:
             self.logger.error(f"Error cargando {filename}: {e}")
             return None
 
+    @traced("comparator.find_account_files")
     def find_account_files(self, account_name):
-        pattern = f"{account_name}_data_*.json"
-        files = []
-        for file_path in self.data_dir.glob(pattern):
-            files.append(str(file_path))
-        files.sort()
-        return files
+        # Snapshots completos y marcadores "sin cambios", en orden cronológico
+        return [str(file_path) for file_path in find_snapshot_files(self.data_dir, account_name)]
+
+    def list_accounts(self):
+        """Return the sorted names of every account with at least one snapshot"""
+        return sorted({account for account, _ in iter_all_snapshot_files(self.data_dir)})
+
+    def load_change_record(self, file1, file2):
+        """Return the change record stored with file2 if it was computed against file1"""
+        changes_path = snapshot_sidecar_path(file2, "changes")
+        if not changes_path.exists():
+            return None
+        try:
+            with open(changes_path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+            info = record['comparison_info']
+            if info['file1']['filename'] == Path(file1).name and info['file2']['filename'] == Path(file2).name:
+                return record
+        except Exception as e:
+            self.logger.warning(f"Reporte de cambios inválido {changes_path}: {e}")
+        return None
+
+    @traced("comparator.compare_data")
+    @memory_profiled("compare_data")
+    def compare_data(self, file1, file2, cancel_token=None):
+        """Compare two snapshots; returns None if cancel_token is cancelled between steps"""
+        def cancelled():
+            return cancel_token is not None and cancel_token.cancelled
+
+        started = time.perf_counter()
+        # Reutilizar el reporte calculado durante la extracción si existe
+        change_record = self.load_change_record(file1, file2)
+        if change_record:
+            self.logger.info(f"Usando reporte de cambios precalculado: {Path(file2).name}")
+            return change_record
 
-    def compare_data(self, file1, file2):
         # Cargar datos
+        if cancelled():
+            return None
         data1 = self.load_data(file1)
+        if cancelled():
+            return None
         data2 = self.load_data(file2)
-        
+        if cancelled():
+            return None
+
         if not data1 or not data2:
             return None
         
@@ -38,66 +141,20 @@ class InstagramComparator:
             return None
         
         account_name = data1['account']
-        
-        # Convertir listas a sets para operaciones de conjuntos
-        followers1 = set(data1['followers'])
-        following1 = set(data1['following'])
-        
-        followers2 = set(data2['followers'])
-        following2 = set(data2['following'])
-        
-        # Análisis de cambios en seguidores
-        new_followers = followers2 - followers1  # Nuevos seguidores
-        lost_followers = followers1 - followers2  # Seguidores perdidos
-        
-        # Análisis de cambios en seguidos
-        new_following = following2 - following1  # Nuevos seguidos
-        unfollowed = following1 - following2     # Dejó de seguir
-        
-        # Análisis de relaciones actuales (del archivo más reciente)
-        mutual_follows = followers2 & following2  # Se siguen mutuamente
-        follows_but_not_followed = following2 - followers2  # Sigue pero no lo siguen
-        followed_but_not_following = followers2 - following2  # Lo siguen pero no sigue
-        
-        # Crear reporte completo
-        comparison = {
-            "account": account_name,
-            "comparison_info": {
-                "file1": {
-                    "filename": Path(file1).name,
-                    "date": data1.get('extraction_date', 'No disponible'),
-                    "followers_count": len(followers1),
-                    "following_count": len(following1)
-                },
-                "file2": {
-                    "filename": Path(file2).name,
-                    "date": data2.get('extraction_date', 'No disponible'),
-                    "followers_count": len(followers2),
-                    "following_count": len(following2)
-                }
-            },
-            "changes": {
-                "new_followers": sorted(list(new_followers)),
-                "lost_followers": sorted(list(lost_followers)),
-                "new_following": sorted(list(new_following)),
-                "unfollowed": sorted(list(unfollowed))
-            },
-            "current_relationships": {
-                "mutual_follows": sorted(list(mutual_follows)),
-                "follows_but_not_followed": sorted(list(follows_but_not_followed)),
-                "followed_but_not_following": sorted(list(followed_but_not_following))
-            },
-            "stats": {
-                "followers_gained": len(new_followers),
-                "followers_lost": len(lost_followers),
-                "net_followers_change": len(new_followers) - len(lost_followers),
-                "new_following_count": len(new_following),
-                "unfollowed_count": len(unfollowed),
-                "net_following_change": len(new_following) - len(unfollowed),
-                "mutual_follows_count": len(mutual_follows),
-                "follows_but_not_followed_count": len(follows_but_not_followed),
-                "followed_but_not_following_count": len(followed_but_not_following)
-            }
-        }
-        
+
+        comparison = build_comparison_report(
+            account_name,
+            {'filename': Path(file1).name, 'date': data1.get('extraction_date', 'No disponible')},
+            {'filename': Path(file2).name, 'date': data2.get('extraction_date', 'No disponible')},
+            set(data1['followers']),
+            set(data1['following']),
+            set(data2['followers']),
+            set(data2['following']),
+        )
+
+        with log_context(account=account_name):
+            self.logger.info(
+                f"Comparación {Path(file1).name} vs {Path(file2).name} completada",
+                extra={'duration_ms': round((time.perf_counter() - started) * 1000, 1)},
+            )
         return comparison
\ No newline at end of file
@@ -1,17 +1,52 @@
 import os
 import time
 import json
+import uuid
 from datetime import datetime
-from instagrapi import Client
+from pathlib import Path
+
+from config.settings import (
+    EXTRACTION_MAX_RETRIES,
+    EXTRACTION_PAGE_SIZE,
+    EXTRACTION_PAUSE_SECONDS,
+    EXTRACTION_RETRY_BACKOFF_SECONDS,
+    log_context,
+)
+from core.account_catalog import register_snapshot, reload_catalog
+from core.change_tracker import ChangeTracker, write_change_record
+from core.follower_metadata import UserTable, write_snapshot_metadata
+from core.instagram_comparator import InstagramComparator
+from core.membership_index import MembershipIndex
+from core.sketches import write_snapshot_sketch
+from core.snapshot_dedup import (
+    snapshot_content_hash,
+    unchanged_base_path,
+    unchanged_marker_path,
+    write_unchanged_marker,
+)
+from utils.helpers import snapshot_dir_for, snapshot_sidecar_path
+from utils.snapshot_cache import UNCHANGED_MARKER_SUFFIX, snapshot_cache, snapshot_version_key
+from utils.memory_profiler import memory_profiled
+from utils.tracing import trace_span, traced
+
+# Errores de instagrapi que no se arreglan reintentando la misma página
+NON_RETRYABLE_ERRORS = {"ChallengeRequired", "LoginRequired", "UserNotFound"}
+
 
 class SimpleInstagramExtractor:
-    def __init__(self, sessions_dir, data_dir, logger):
-        self.client = Client()
+    def __init__(self, sessions_dir, data_dir, logger, client=None):
+        if client is None:
+            from instagrapi import Client
+            client = Client()
+        self.client = client
+        self.pause_seconds = EXTRACTION_PAUSE_SECONDS
+        self.retry_backoff_seconds = EXTRACTION_RETRY_BACKOFF_SECONDS
         self.logged_in = False
         self.session_file = sessions_dir / "session.json"
         self.data_dir = data_dir
         self.logger = logger
 
+    @traced("extractor.login")
     def login(self, username, password) -> bool:
         try:
             # Try to load existing session
@@ -47,7 +82,7 @@ class SimpleInstagramExtractor:
     def verify_account_access(self, username) -> dict:
         try:
             self.logger.info(f"Verificando acceso para @{username}...")
-            user_info = self.client.user_info_by_username(username)
+            user_info = self.fetch_user_info(username)
 
             access_info = {
                 'can_access': True,
@@ -69,51 +104,172 @@ class SimpleInstagramExtractor:
             self.logger.error(f"No se puede acceder a @{username}: {e}")
             return {'can_access': False, 'error': str(e)}
 
-    def get_followers_list(self, username) -> list:
+    def fetch_user_pages(self, fetch_chunk, user_id, on_page=None) -> list:
+        """Fetch a follower/following list page by page, calling on_page with each page's usernames"""
+        users = []
+        seen_pks = set()
+        cursor = ""
+        while True:
+            page, cursor = self.fetch_page_with_retries(fetch_chunk, user_id, cursor)
+
+            new_users = [user for user in page if user.pk not in seen_pks]
+            seen_pks.update(user.pk for user in new_users)
+            users.extend(new_users)
+            if on_page:
+                on_page([user.username for user in new_users])
+
+            self.logger.info(f"Página recibida: {len(page)} usuarios ({len(users)} acumulados)")
+            if not cursor or not page:
+                break
+        return users
+
+    def call_with_retries(self, span_name, request, *args, **kwargs):
+        """Run one Instagram request, retrying transient errors with exponential backoff"""
+        attempt = 0
+        while True:
+            try:
+                with trace_span(span_name):
+                    return request(*args, **kwargs)
+            except Exception as e:
+                if attempt >= EXTRACTION_MAX_RETRIES or type(e).__name__ in NON_RETRYABLE_ERRORS:
+                    raise
+                delay = self.retry_backoff_seconds * (2 ** attempt)
+                attempt += 1
+                self.logger.warning(
+                    f"Error en {span_name} ({e}); reintento {attempt}/{EXTRACTION_MAX_RETRIES} en {delay}s"
+                )
+                time.sleep(delay)
+
+    def fetch_page_with_retries(self, fetch_chunk, user_id, cursor):
+        """Fetch one page, retrying from the same cursor with exponential backoff"""
+        return self.call_with_retries(
+            "instagram.page", fetch_chunk, user_id, max_amount=EXTRACTION_PAGE_SIZE, max_id=cursor
+        )
+
+    def fetch_user_info(self, username):
+        return self.call_with_retries("instagram.user_info", self.client.user_info_by_username, username)
+
+    def fill_user_table(self, table, users):
+        """Add users to a metadata table; a user whose fields cannot be parsed is left out of it"""
+        skipped = 0
+        for user in users:
+            try:
+                table.append_user(user)
+            except Exception:
+                skipped += 1
+        if skipped:
+            self.logger.warning(f"{skipped} usuarios sin metadata válida, omitidos de la tabla")
+
+    def get_followers_list(self, username, on_page=None, table=None):
+        """Followers' usernames, or None if the list could not be fetched completely"""
         try:
-            user_info = self.client.user_info_by_username(username)
+            user_info = self.fetch_user_info(username)
             user_id = user_info.pk
 
             self.logger.info(f"Obteniendo seguidores de @{username} - Total esperado: {user_info.follower_count}")
 
-            # Get all followers
-            followers_dict = self.client.user_followers(user_id)
+            # Get all followers, page by page when the client supports it
+            fetch_chunk = getattr(self.client, "user_followers_v1_chunk", None)
+            if fetch_chunk:
+                followers = self.fetch_user_pages(fetch_chunk, user_id, on_page)
+            else:
+                followers = list(self.client.user_followers(user_id).values())
+                if on_page:
+                    on_page([follower_info.username for follower_info in followers])
 
             # Extract only usernames
             followers_list = []
-            for follower_info in followers_dict.values():
+            for follower_info in followers:
                 followers_list.append(follower_info.username)
 
             self.logger.info(f"{len(followers_list)} seguidores obtenidos")
-            return followers_list
 
         except Exception as e:
             self.logger.error(f"Error obteniendo seguidores de @{username}: {e}")
-            return []
+            return None
 
-    def get_following_list(self, username) -> list:
+        # Keep the rest of the fields in the columnar side table
+        if table is not None:
+            self.fill_user_table(table, followers)
+        return followers_list
+
+    def get_following_list(self, username, on_page=None, table=None):
+        """Followed usernames, or None if the list could not be fetched completely"""
         try:
-            user_info = self.client.user_info_by_username(username)
+            user_info = self.fetch_user_info(username)
             user_id = user_info.pk
 
             self.logger.info(f"Obteniendo seguidos de @{username} - Total esperado: {user_info.following_count}")
 
-            # Get all following
-            following_dict = self.client.user_following(user_id)
+            # Get all following, page by page when the client supports it
+            fetch_chunk = getattr(self.client, "user_following_v1_chunk", None)
+            if fetch_chunk:
+                following = self.fetch_user_pages(fetch_chunk, user_id, on_page)
+            else:
+                following = list(self.client.user_following(user_id).values())
+                if on_page:
+                    on_page([following_info.username for following_info in following])
 
             # Extract only usernames
             following_list = []
-            for following_info in following_dict.values():
+            for following_info in following:
                 following_list.append(following_info.username)
 
             self.logger.info(f"{len(following_list)} seguidos obtenidos")
-            return following_list
 
         except Exception as e:
             self.logger.error(f"Error obteniendo seguidos de @{username}: {e}")
-            return []
+            return None
+
+        # Keep the rest of the fields in the columnar side table
+        if table is not None:
+            self.fill_user_table(table, following)
+        return following_list
+
+    def start_change_tracker(self, target_username, on_alert=None):
+        """Load the previous snapshot of the target to diff against while extracting"""
+        comparator = InstagramComparator(self.data_dir, self.logger)
+        previous_files = comparator.find_account_files(target_username)
+        if not previous_files:
+            self.logger.info("Sin snapshot previo, no se calcularán cambios")
+            return None
+
+        previous_data = comparator.load_data(previous_files[-1])
+        if not previous_data:
+            return None
+        return ChangeTracker(previous_files[-1], previous_data, self.logger, on_alert=on_alert)
 
-    def extract_account(self, target_username) -> dict:
+    def update_membership_index(self, target_username, filepath, timestamp_str, followers, following):
+        try:
+            # El snapshot recién escrito se añade desde memoria; sync solo lee los que falten
+            index = MembershipIndex.load(self.data_dir, target_username, self.logger)
+            version = list(snapshot_version_key(filepath))
+            if not index.add_snapshot(timestamp_str, followers, following, version) or not index.sync():
+                self.logger.warning("Snapshot fuera de orden, reconstruyendo índice...")
+                index = MembershipIndex(self.data_dir, target_username, self.logger)
+                index.sync()
+            index.save()
+            self.logger.info(f"Índice de membresía actualizado ({len(index.snapshots)} snapshots)")
+        except Exception as e:
+            self.logger.warning(f"No se pudo actualizar el índice de membresía: {e}")
+
+    @traced("extractor.extract_account")
+    @memory_profiled("extract_account")
+    def extract_account(self, target_username, on_alert=None) -> dict:
+        """Extract a snapshot; every log line of the run carries its job_id and account"""
+        job_id = uuid.uuid4().hex[:12]
+        started = time.perf_counter()
+        with log_context(job_id=job_id, account=target_username):
+            result = self._extract_account(target_username, on_alert)
+            self.logger.info(
+                f"Extracción {'completada' if result else 'fallida'}",
+                extra={'duration_ms': round((time.perf_counter() - started) * 1000, 1)},
+            )
+        if result:
+            result['job_id'] = job_id
+        return result
+
+    def _extract_account(self, target_username, on_alert=None) -> dict:
         if not self.logged_in:
             self.logger.error("Debes iniciar sesión primero")
             return None
@@ -126,21 +282,47 @@ class SimpleInstagramExtractor:
             self.logger.error(f"No se puede acceder a la cuenta @{target_username}")
             return None
 
+        # Diff against the previous snapshot while pages arrive
+        tracker = self.start_change_tracker(target_username, on_alert)
+
+        # Metadata (pk, nombre, privacidad, foto) que ya viene en cada página
+        user_tables = {'followers': UserTable(), 'following': UserTable()}
+
         # Get followers
         self.logger.info("=" * 50)
         self.logger.info("PASO 1: EXTRAYENDO SEGUIDORES")
         self.logger.info("=" * 50)
-        followers = self.get_followers_list(target_username)
+        followers = self.get_followers_list(
+            target_username,
+            on_page=(lambda page: tracker.add_page('followers', page)) if tracker else None,
+            table=user_tables['followers'],
+        )
+        # Una lista incompleta no se guarda: sería la base de la próxima comparación
+        if followers is None:
+            self.logger.error("Lista de seguidores incompleta, no se guarda el snapshot")
+            return None
+        if tracker:
+            tracker.finish_relation('followers', followers)
 
         # Delay to avoid rate limits
-        self.logger.info("⏳ Pausa de 5 segundos entre requests...")
-        time.sleep(5)
+        if self.pause_seconds:
+            self.logger.info(f"⏳ Pausa de {self.pause_seconds} segundos entre requests...")
+            time.sleep(self.pause_seconds)
 
         # Get following
         self.logger.info("=" * 50)
         self.logger.info("PASO 2: EXTRAYENDO SEGUIDOS")
         self.logger.info("=" * 50)
-        following = self.get_following_list(target_username)
+        following = self.get_following_list(
+            target_username,
+            on_page=(lambda page: tracker.add_page('following', page)) if tracker else None,
+            table=user_tables['following'],
+        )
+        if following is None:
+            self.logger.error("Lista de seguidos incompleta, no se guarda el snapshot")
+            return None
+        if tracker:
+            tracker.finish_relation('following', following)
 
         # Create data structure
         timestamp = datetime.now()
@@ -155,13 +337,28 @@ class SimpleInstagramExtractor:
                 "total_following": len(following),
                 "expected_followers": access_info.get('follower_count', 0),
                 "expected_following": access_info.get('following_count', 0)
-            }
+            },
+            "content_hash": snapshot_content_hash(followers, following),
         }
 
         # Generate filename
         timestamp_str = timestamp.strftime('%Y%m%d%H%M')
         filename = f"{target_username}_data_{timestamp_str}.json"
-        filepath = self.data_dir / filename
+        filepath = snapshot_dir_for(self.data_dir, target_username, timestamp_str) / filename
+
+        # Re-extracción en el mismo minuto: el archivo anterior se reemplaza
+        same_minute = bool(tracker) and Path(tracker.previous_file).stem == filepath.stem
+
+        # Listas idénticas al último snapshot: guardar solo un marcador que apunta a él
+        base_path = None
+        if tracker and not same_minute:
+            base_path = unchanged_base_path(
+                tracker.previous_file, tracker.previous_data, account_data['content_hash']
+            )
+        if base_path:
+            filepath = unchanged_marker_path(filepath)
+            filename = filepath.name
+            self.logger.info(f"Sin cambios desde {base_path.name}, se guarda solo un marcador")
 
         # Guardar archivo JSON
         self.logger.info("=" * 50)
@@ -170,9 +367,13 @@ class SimpleInstagramExtractor:
 
         try:
             self.logger.info(f"Guardando datos en: {filepath}")
+            filepath.parent.mkdir(parents=True, exist_ok=True)
 
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(account_data, f, indent=2, ensure_ascii=False)
+            if base_path:
+                write_unchanged_marker(filepath, base_path, account_data)
+            else:
+                with trace_span("extractor.write_json"), open(filepath, 'w', encoding='utf-8') as f:
+                    json.dump(account_data, f, indent=2, ensure_ascii=False)
 
             # Check file creation
             if filepath.exists():
@@ -188,6 +389,53 @@ class SimpleInstagramExtractor:
             self.logger.error(f"Error guardando archivo: {e}")
             return None
 
+        # Un snapshot y un marcador del mismo minuto no pueden convivir
+        replaced = filepath.with_suffix(".json" if base_path else UNCHANGED_MARKER_SUFFIX)
+        if replaced.exists():
+            replaced.unlink()
+            snapshot_cache.invalidate(replaced)
+            reload_catalog()
+
+        # Mantener al día el catálogo de cuentas de la interfaz
+        register_snapshot(filepath)
+
+        # Actualizar el índice de membresía con el nuevo snapshot
+        with trace_span("extractor.membership_index"):
+            self.update_membership_index(target_username, filepath, timestamp_str, followers, following)
+
+        # Reporte de cambios listo junto al snapshot
+        changes = None
+        if same_minute:
+            # El reporte existente comparaba contra el contenido reemplazado
+            snapshot_sidecar_path(filepath, "changes").unlink(missing_ok=True)
+        elif tracker:
+            try:
+                changes = tracker.finalize(target_username, filename, account_data['extraction_date'])
+                with trace_span("extractor.change_record"):
+                    write_change_record(filepath, changes)
+                self.logger.info(
+                    f"Cambios: +{changes['stats']['followers_gained']} / -{changes['stats']['followers_lost']} seguidores"
+                )
+            except Exception as e:
+                self.logger.warning(f"No se pudo guardar el reporte de cambios: {e}")
+                changes = None
+
+        # Un marcador reutiliza la metadata y los sketches de su snapshot base
+        if not base_path:
+            # Tabla columnar de metadata junto al snapshot
+            try:
+                with trace_span("extractor.metadata"):
+                    write_snapshot_metadata(filepath, user_tables)
+            except Exception as e:
+                self.logger.warning(f"No se pudo guardar la metadata de usuarios: {e}")
+
+            # Sketches aproximados (HyperLogLog / MinHash) junto al snapshot
+            try:
+                with trace_span("extractor.sketch"):
+                    write_snapshot_sketch(filepath, account_data)
+            except Exception as e:
+                self.logger.warning(f"No se pudieron calcular los sketches: {e}")
+
         # Mostrar resumen final
         self.logger.info("=" * 50)
         self.logger.info("EXTRACCIÓN COMPLETADA")
@@ -202,5 +450,6 @@ class SimpleInstagramExtractor:
             'success': True,
             'data': account_data,
             'filepath': str(filepath),
-            'filename': filename
+            'filename': filename,
+            'changes': changes
         }
\ No newline at end of file
@@ -0,0 +1,209 @@
+import json
+import os
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+
+from core.instagram_comparator import InstagramComparator
+from utils.helpers import snapshot_timestamp
+from utils.snapshot_cache import snapshot_cache, snapshot_version_key
+
+RELATIONS = ('followers', 'following')
+
+
+class MembershipIndex:
+    """Inverted index of follower/following membership for one account.
+
+    For each username it keeps the intervals ``[start, end)`` in which the user
+    was present, where ``start`` is the timestamp of the first snapshot that
+    contained it and ``end`` the first later snapshot that did not (``None``
+    while still present). Per-snapshot join/leave events make range queries
+    proportional to the churn, not to the audience size. The file version
+    (path, mtime, size) of every indexed snapshot is kept so a snapshot
+    rewritten under the same timestamp forces a rebuild.
+    """
+
+    def __init__(self, data_dir, account, logger):
+        self.account = account
+        self.data_dir = Path(data_dir)
+        self.logger = logger
+        self.snapshots = []
+        self.versions = {}
+        self.intervals = {relation: {} for relation in RELATIONS}
+        self.events = {relation: {} for relation in RELATIONS}
+
+    @property
+    def index_path(self) -> Path:
+        return self.data_dir / ".index" / f"{self.account}_membership.json"
+
+    # =====================| Construcción |=====================
+    @classmethod
+    def load(cls, data_dir, account, logger):
+        """Load the persisted index as stored, without reading any snapshot"""
+        index = cls(data_dir, account, logger)
+        if index.index_path.exists():
+            try:
+                index._load()
+            except Exception as e:
+                logger.warning(f"Índice de @{account} dañado, se reconstruye: {e}")
+                index = cls(data_dir, account, logger)
+        return index
+
+    @classmethod
+    def load_or_build(cls, data_dir, account, logger):
+        """Load the persisted index, catching up with any snapshot it is missing"""
+        index = cls.load(data_dir, account, logger)
+        if not index.sync():
+            index = cls(data_dir, account, logger)
+            index.sync()
+        index.save()
+        return index
+
+    def sync(self, before_load=None) -> bool:
+        """Add snapshots found on disk that are newer than the index. Returns False if a rebuild is needed
+        (a snapshot older than the index, or an indexed one rewritten since).
+
+        before_load(file_path) is called before each snapshot is read (e.g. to throttle I/O).
+        """
+        comparator = InstagramComparator(self.data_dir, self.logger)
+        known = set(self.snapshots)
+        pending = []
+        for file_path in comparator.find_account_files(self.account):
+            timestamp = snapshot_timestamp(file_path, self.account)
+            if not timestamp:
+                continue
+            version = list(snapshot_version_key(file_path))
+            if timestamp not in known:
+                pending.append((timestamp, file_path, version))
+            elif self.versions.get(timestamp) != version:
+                # Re-extraído en el mismo minuto: el archivo cambió después de indexarlo
+                self.logger.info(f"Snapshot {timestamp} de @{self.account} reescrito, se reconstruye el índice")
+                return False
+
+        for timestamp, file_path, version in sorted(pending):
+            if before_load:
+                before_load(file_path)
+            data = snapshot_cache.get(file_path)
+            if not self.add_snapshot(timestamp, data['followers'], data['following'], version):
+                return False
+        return True
+
+    def add_snapshot(self, timestamp, followers, following, version=None) -> bool:
+        """Apply one snapshot incrementally. Returns False if it is older than the last one indexed,
+        or if it is already indexed with a different file version."""
+        if timestamp in self.snapshots:
+            return version is None or self.versions.get(timestamp) == version
+        if self.snapshots and timestamp < self.snapshots[-1]:
+            return False
+
+        for relation, usernames in (('followers', followers), ('following', following)):
+            current = set(usernames)
+            intervals = self.intervals[relation]
+            joined = []
+            left = []
+
+            for username, spans in intervals.items():
+                if spans[-1][1] is None and username not in current:
+                    spans[-1][1] = timestamp
+                    left.append(username)
+
+            for username in current:
+                spans = intervals.get(username)
+                if spans is None:
+                    intervals[username] = [[timestamp, None]]
+                    joined.append(username)
+                elif spans[-1][1] is not None:
+                    spans.append([timestamp, None])
+                    joined.append(username)
+
+            self.events[relation][timestamp] = {'joined': sorted(joined), 'left': sorted(left)}
+
+        self.snapshots.append(timestamp)
+        if version is not None:
+            self.versions[timestamp] = version
+        return True
+
+    # =====================| Persistencia |=====================
+    def _load(self):
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+        self.snapshots = stored['snapshots']
+        self.versions = stored.get('versions', {})
+        self.intervals = stored['intervals']
+        self.events = stored['events']
+
+    def save(self):
+        self.index_path.parent.mkdir(exist_ok=True)
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(
+                {
+                    'account': self.account,
+                    'snapshots': self.snapshots,
+                    'versions': self.versions,
+                    'intervals': self.intervals,
+                    'events': self.events,
+                },
+                f,
+                ensure_ascii=False,
+            )
+        os.replace(tmp_path, self.index_path)
+
+    # =====================| Consultas |=====================
+    def _snapshot_at(self, timestamp):
+        """Latest indexed snapshot taken at or before timestamp"""
+        position = bisect_right(self.snapshots, timestamp)
+        return self.snapshots[position - 1] if position else None
+
+    def _last_seen(self, end):
+        if end is None:
+            return self.snapshots[-1]
+        position = bisect_left(self.snapshots, end)
+        return self.snapshots[position - 1]
+
+    def is_member(self, username, relation, timestamp) -> bool:
+        snapshot = self._snapshot_at(timestamp)
+        if snapshot is None:
+            return False
+        for start, end in self.intervals[relation].get(username, []):
+            if start <= snapshot and (end is None or snapshot < end):
+                return True
+        return False
+
+    def lookup(self, username) -> dict:
+        """Membership history of a user in followers and following"""
+        history = {}
+        for relation in RELATIONS:
+            history[relation] = [
+                {
+                    'first_seen': start,
+                    'last_seen': self._last_seen(end),
+                    'left_at': end,
+                }
+                for start, end in self.intervals[relation].get(username, [])
+            ]
+        return history
+
+    def _changed_between(self, t1, t2, relation, event):
+        start = self._snapshot_at(t1)
+        end = self._snapshot_at(t2)
+        if end is None or start == end:
+            return []
+
+        candidates = set()
+        for snapshot in self.snapshots[bisect_right(self.snapshots, start or ""):bisect_right(self.snapshots, end)]:
+            candidates.update(self.events[relation][snapshot][event])
+
+        was_member = event == 'left'
+        return sorted(
+            username for username in candidates
+            if (start is not None and self.is_member(username, relation, start)) == was_member
+            and self.is_member(username, relation, end) != was_member
+        )
+
+    def churned_between(self, t1, t2, relation='followers') -> list:
+        """Users present at T1 and absent at T2"""
+        return self._changed_between(t1, t2, relation, 'left')
+
+    def joined_between(self, t1, t2, relation='followers') -> list:
+        """Users absent at T1 and present at T2"""
+        return self._changed_between(t1, t2, relation, 'joined')
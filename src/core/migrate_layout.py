@@ -0,0 +1,117 @@
+import argparse
+import json
+import logging
+import os
+from pathlib import Path
+
+from core.account_catalog import reload_catalog
+from core.compaction import SIDECAR_KINDS
+from utils.helpers import SNAPSHOT_SUFFIXES, snapshot_dir_for, snapshot_sidecar_path, snapshot_timestamp
+from utils.snapshot_cache import is_unchanged_marker, read_unchanged_marker, snapshot_cache
+
+
+def flat_snapshot_files(data_dir) -> list:
+    """(account, path) of the snapshots still stored directly in data_dir, full snapshots first"""
+    files = []
+    for suffix in SNAPSHOT_SUFFIXES:
+        for file_path in sorted(Path(data_dir).glob(f"*_data_*{suffix}")):
+            files.append((file_path.name.rsplit("_data_", 1)[0], file_path))
+    return files
+
+
+def sharded_path(data_dir, account, file_path):
+    """Target path of a flat snapshot in data_dir/account/YYYY/MM, or None if its name has no timestamp"""
+    timestamp = snapshot_timestamp(file_path, account)
+    if not timestamp:
+        return None
+    return snapshot_dir_for(data_dir, account, timestamp) / Path(file_path).name
+
+
+def locate_snapshot(data_dir, account, filename) -> Path:
+    """Current location of a snapshot file: sharded if already moved, flat otherwise"""
+    target = sharded_path(data_dir, account, filename)
+    if target and target.exists():
+        return target
+    return Path(data_dir) / filename
+
+
+def move_sidecars(file_path, target):
+    target.parent.mkdir(parents=True, exist_ok=True)
+    for kind in SIDECAR_KINDS:
+        sidecar = snapshot_sidecar_path(file_path, kind)
+        if sidecar.exists():
+            os.replace(sidecar, snapshot_sidecar_path(target, kind))
+
+
+def move_snapshot(file_path, target):
+    """Move a full snapshot with its sidecars; the snapshot goes last so an interrupted run resumes cleanly"""
+    move_sidecars(file_path, target)
+    os.replace(file_path, target)
+
+
+def move_marker(data_dir, account, file_path, target):
+    """Rewrite an unchanged marker next to its new location, pointing at its base by relative path"""
+    marker = read_unchanged_marker(file_path)
+    base_name = Path(marker['unchanged_since']).name
+    base_path = locate_snapshot(data_dir, account, base_name)
+    marker['unchanged_since'] = Path(os.path.relpath(base_path, target.parent)).as_posix()
+
+    # Los marcadores también tienen reporte de cambios
+    move_sidecars(file_path, target)
+    tmp_path = Path(f"{target}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(marker, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, target)
+    Path(file_path).unlink()
+
+
+def migrate_layout(data_dir, logger, dry_run=False) -> dict:
+    """Move every flat snapshot into data_dir/account/YYYY/MM.
+
+    Run it with the app closed. Each file is moved with an atomic rename, so the
+    migration can be interrupted and run again: files already moved are skipped.
+    """
+    data_dir = Path(data_dir)
+    moved = {}
+    skipped = []
+
+    logger.info(f"Migración a carpetas por cuenta{' (simulación)' if dry_run else ''}: {data_dir}")
+    for account, file_path in flat_snapshot_files(data_dir):
+        target = sharded_path(data_dir, account, file_path)
+        if target is None:
+            skipped.append(file_path.name)
+            continue
+        if not dry_run:
+            try:
+                if is_unchanged_marker(file_path):
+                    move_marker(data_dir, account, file_path, target)
+                else:
+                    move_snapshot(file_path, target)
+            except (OSError, ValueError) as e:
+                logger.warning(f"No se pudo mover {file_path.name}: {e}")
+                skipped.append(file_path.name)
+                continue
+            snapshot_cache.invalidate(file_path)
+        moved[account] = moved.get(account, 0) + 1
+
+    if not dry_run:
+        reload_catalog()
+
+    total = sum(moved.values())
+    logger.info(f"Migración terminada: {total} archivos de {len(moved)} cuentas, {len(skipped)} omitidos")
+    return {'dry_run': dry_run, 'moved': moved, 'total_moved': total, 'skipped': skipped}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mueve los snapshots a carpetas por cuenta, año y mes")
+    parser.add_argument("--data-dir", default=str(Path(__file__).resolve().parents[1] / "instagram_data"))
+    parser.add_argument("--dry-run", action="store_true", help="Solo cuenta los archivos, sin moverlos")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    summary = migrate_layout(args.data_dir, logging.getLogger(__name__), dry_run=args.dry_run)
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
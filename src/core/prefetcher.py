@@ -0,0 +1,85 @@
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from config.settings import PREFETCH_MAX_BYTES, PREFETCH_WAIT_POLL_SECONDS
+from core.instagram_comparator import InstagramComparator
+from utils.snapshot_cache import resolve_snapshot_path, snapshot_cache
+from utils.task_runner import CancelToken
+
+
+class SnapshotPrefetcher:
+    """Speculatively loads the two newest snapshots of an account (and their diff).
+
+    Work runs on a single background thread, one job at a time; a new prefetch
+    cancels the previous one. Files bigger than PREFETCH_MAX_BYTES are skipped.
+    """
+
+    def __init__(self, data_dir, logger, max_bytes=PREFETCH_MAX_BYTES):
+        self.comparator = InstagramComparator(data_dir, logger)
+        self.logger = logger
+        self.max_bytes = max_bytes
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._lock = threading.RLock()
+        self._token = None
+        self._pair = None
+        self._future = None
+
+    def prefetch(self, file_paths, compute_diff=True):
+        """file_paths: snapshot paths of one account, most recent first"""
+        if len(file_paths) < 2:
+            return
+        pair = (file_paths[1], file_paths[0])
+
+        with self._lock:
+            if self._pair == pair and self._future and not self._future.cancelled():
+                return
+            self.cancel()
+            token = CancelToken()
+            self._token = token
+            self._pair = pair
+            self._future = self._executor.submit(self._run, token, pair, compute_diff)
+
+    def _run(self, token, pair, compute_diff):
+        for file_path in pair:
+            if token.cancelled:
+                return None
+            if resolve_snapshot_path(file_path).stat().st_size > self.max_bytes:
+                self.logger.info(f"Precarga omitida por tamaño: {Path(file_path).name}")
+                return None
+            snapshot_cache.get(file_path)
+
+        if not compute_diff or token.cancelled:
+            return None
+        self.logger.info(f"Comparación precalculada: {Path(pair[0]).name} -> {Path(pair[1]).name}")
+        return self.comparator.compare_data(*pair, cancel_token=token)
+
+    def get_comparison(self, file1, file2, cancel_token=None):
+        """Return the prefetched comparison for this pair, waiting while it is still running.
+
+        Returns None as soon as cancel_token is cancelled, so a superseded caller stops waiting.
+        """
+        with self._lock:
+            if self._pair != (file1, file2) or not self._future:
+                return None
+            future = self._future
+        while not future.done():
+            if cancel_token is not None and cancel_token.cancelled:
+                return None
+            wait([future], timeout=PREFETCH_WAIT_POLL_SECONDS)
+        try:
+            return future.result()
+        except CancelledError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Error en la precarga: {e}")
+            return None
+
+    def cancel(self):
+        with self._lock:
+            if self._token:
+                self._token.cancel()
+            if self._future:
+                self._future.cancel()
+            self._pair = None
+            self._future = None
@@ -0,0 +1,192 @@
+import base64
+import hashlib
+import heapq
+import json
+import math
+from pathlib import Path
+
+from core.instagram_comparator import InstagramComparator
+from utils.helpers import snapshot_sidecar_path
+from utils.snapshot_cache import resolve_snapshot_path, snapshot_cache, snapshot_version_key
+
+HLL_PRECISION = 12
+MINHASH_SIZE = 256
+RELATIONS = ('followers', 'following')
+
+_HASH_BITS = 64
+_HASH_MASK = (1 << _HASH_BITS) - 1
+_INVERSE_POWERS = [2.0 ** -rank for rank in range(_HASH_BITS + 1)]
+
+
+def hash_username(username) -> int:
+    return int.from_bytes(hashlib.blake2b(username.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter with 2^precision one-byte registers"""
+
+    def __init__(self, precision=HLL_PRECISION, registers=None):
+        self.precision = precision
+        self.registers = registers if registers is not None else bytearray(1 << precision)
+
+    def add_hash(self, value):
+        index = value >> (_HASH_BITS - self.precision)
+        remaining = (value << self.precision) & _HASH_MASK
+        rank = _HASH_BITS - self.precision + 1 if remaining == 0 else _HASH_BITS - remaining.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        return HyperLogLog(
+            self.precision,
+            bytearray(map(max, self.registers, other.registers)),
+        )
+
+    def estimate(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(map(_INVERSE_POWERS.__getitem__, self.registers))
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Corrección para rangos pequeños (linear counting)
+            estimate = m * math.log(m / zeros)
+        return estimate
+
+    def to_dict(self) -> dict:
+        return {
+            'precision': self.precision,
+            'registers': base64.b64encode(bytes(self.registers)).decode('ascii'),
+        }
+
+    @classmethod
+    def from_dict(cls, stored):
+        return cls(stored['precision'], bytearray(base64.b64decode(stored['registers'])))
+
+
+class MinHash:
+    """Bottom-k MinHash signature: the k smallest username hashes"""
+
+    def __init__(self, size=MINHASH_SIZE, hashes=None):
+        self.size = size
+        self.hashes = hashes or []
+        self._hash_set = set(self.hashes)
+
+    @classmethod
+    def from_hashes(cls, hashes, size=MINHASH_SIZE):
+        return cls(size, heapq.nsmallest(size, hashes))
+
+    def jaccard(self, other) -> float:
+        size = min(self.size, other.size)
+        union = heapq.nsmallest(size, self._hash_set | other._hash_set)
+        if not union:
+            return 0.0
+        both = self._hash_set & other._hash_set
+        return sum(1 for value in union if value in both) / len(union)
+
+
+def build_sketch(usernames) -> dict:
+    unique_hashes = {hash_username(username) for username in usernames}
+    hll = HyperLogLog()
+    for value in unique_hashes:
+        hll.add_hash(value)
+    return {
+        'count': len(unique_hashes),
+        'hll': hll.to_dict(),
+        'minhash': MinHash.from_hashes(unique_hashes).hashes,
+    }
+
+
+def write_snapshot_sketch(snapshot_path, account_data) -> Path:
+    """Compute and store the sketches of a snapshot next to it"""
+    sketch = {
+        'account': account_data['account'],
+        'extraction_date': account_data.get('extraction_date'),
+    }
+    for relation in RELATIONS:
+        sketch[relation] = build_sketch(account_data.get(relation, []))
+
+    sketch_path = snapshot_sidecar_path(snapshot_path, "sketch")
+    with open(sketch_path, 'w', encoding='utf-8') as f:
+        json.dump(sketch, f, ensure_ascii=False)
+    return sketch_path
+
+
+class SketchStore:
+    """Approximate queries over per-snapshot sketches.
+
+    Sketches missing on disk (older snapshots) are computed once from the
+    snapshot and written back. For exact drill-down use
+    ``InstagramComparator.compare_data``.
+    """
+
+    def __init__(self, data_dir, logger):
+        self.data_dir = data_dir
+        self.logger = logger
+        self.comparator = InstagramComparator(data_dir, logger)
+        self._loaded = {}
+
+    def get(self, snapshot_path, relation='followers') -> dict:
+        # Los marcadores "sin cambios" comparten el sketch de su snapshot base
+        snapshot_path = str(resolve_snapshot_path(snapshot_path))
+        # Clave con mtime/tamaño: un snapshot reescrito en el mismo minuto se vuelve a leer
+        key = snapshot_version_key(snapshot_path)
+        if key not in self._loaded:
+            for old_key in [k for k in self._loaded if k[0] == key[0]]:
+                del self._loaded[old_key]
+            sketch_path = snapshot_sidecar_path(snapshot_path, "sketch")
+            if not sketch_path.exists() or sketch_path.stat().st_mtime_ns < key[1]:
+                self.logger.info(f"Calculando sketch faltante para {Path(snapshot_path).name}")
+                write_snapshot_sketch(snapshot_path, snapshot_cache.get(snapshot_path))
+            with open(sketch_path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            self._loaded[key] = {
+                name: {
+                    'count': stored[name]['count'],
+                    'hll': HyperLogLog.from_dict(stored[name]['hll']),
+                    'minhash': MinHash(MINHASH_SIZE, stored[name]['minhash']),
+                }
+                for name in RELATIONS
+            }
+        return self._loaded[key][relation]
+
+    def latest_snapshot(self, account):
+        files = self.comparator.find_account_files(account)
+        return files[-1] if files else None
+
+    def estimate_count(self, snapshot_path, relation='followers') -> float:
+        return self.get(snapshot_path, relation)['hll'].estimate()
+
+    def estimate_jaccard(self, path1, path2, relation='followers') -> float:
+        return self.get(path1, relation)['minhash'].jaccard(self.get(path2, relation)['minhash'])
+
+    def estimate_union(self, path1, path2, relation='followers') -> float:
+        return self.get(path1, relation)['hll'].merge(self.get(path2, relation)['hll']).estimate()
+
+    def estimate_overlap(self, path1, path2, relation='followers') -> float:
+        return self.estimate_jaccard(path1, path2, relation) * self.estimate_union(path1, path2, relation)
+
+    def estimate_growth(self, path1, path2, relation='followers') -> dict:
+        """Approximate gained/lost users going from path1 to path2"""
+        sketch1 = self.get(path1, relation)
+        sketch2 = self.get(path2, relation)
+        overlap = self.estimate_overlap(path1, path2, relation)
+        return {
+            'count1': sketch1['count'],
+            'count2': sketch2['count'],
+            'net_change': sketch2['count'] - sketch1['count'],
+            'gained': max(sketch2['count'] - overlap, 0.0),
+            'lost': max(sketch1['count'] - overlap, 0.0),
+            'jaccard': self.estimate_jaccard(path1, path2, relation),
+        }
+
+    def compare_accounts(self, account1, account2, relation='followers') -> dict:
+        """Approximate audience similarity between the latest snapshots of two accounts"""
+        path1 = self.latest_snapshot(account1)
+        path2 = self.latest_snapshot(account2)
+        if not path1 or not path2:
+            return None
+        return {
+            'jaccard': self.estimate_jaccard(path1, path2, relation),
+            'overlap': self.estimate_overlap(path1, path2, relation),
+            'union': self.estimate_union(path1, path2, relation),
+        }
@@ -0,0 +1,45 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from utils.snapshot_cache import MARKER_FIELDS, UNCHANGED_MARKER_SUFFIX, resolve_snapshot_path
+
+
+def snapshot_content_hash(followers, following) -> str:
+    """Canonical hash of a snapshot's lists: order and duplicates do not matter"""
+    canonical = json.dumps(
+        {'followers': sorted(set(followers)), 'following': sorted(set(following))},
+        ensure_ascii=False,
+        separators=(',', ':'),
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def data_content_hash(data) -> str:
+    """Stored hash of a loaded snapshot, computed for snapshots written before hashing existed"""
+    return data.get('content_hash') or snapshot_content_hash(data.get('followers', []), data.get('following', []))
+
+
+def unchanged_base_path(previous_file, previous_data, content_hash):
+    """Path of the JSON to point a marker at, or None if the lists changed"""
+    if data_content_hash(previous_data) != content_hash:
+        return None
+    # Si el anterior ya era un marcador, apuntar directamente a su base
+    return resolve_snapshot_path(previous_file)
+
+
+def unchanged_marker_path(snapshot_path) -> Path:
+    return Path(snapshot_path).with_suffix(UNCHANGED_MARKER_SUFFIX)
+
+
+def write_unchanged_marker(marker_path, base_path, account_data) -> Path:
+    """Record "unchanged at T" for a snapshot identical to base_path"""
+    marker = {field: account_data[field] for field in MARKER_FIELDS if field in account_data}
+    # Ruta relativa: el base puede estar en otra carpeta de mes
+    marker['unchanged_since'] = Path(os.path.relpath(base_path, Path(marker_path).parent)).as_posix()
+    tmp_path = Path(f"{marker_path}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(marker, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, marker_path)
+    return Path(marker_path)
@@ -1,4 +1,8 @@
 import flet as ft
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
 
 from components.data_mining import (
@@ -10,14 +14,17 @@ from components.data_mining import (
 )
 from components.load_file import (
     account_name_field_component,
+    account_suggestions_component,
     file_selector_component,
     files_found_text_component,
     load_form_container_component,
     load_results_container_component,
 )
 from components.menu import main_menu_component
+from components.user_list import lazy_tabs_component, user_list_component
 from components.analyze_data import (
     analyze_account_name_field_component,
+    analyze_account_suggestions_component,
     analyze_file1_selector_component,
     analyze_file2_selector_component,
     analyze_files_found_text_component,
@@ -25,11 +32,21 @@ from components.analyze_data import (
     analyze_results_container_component,
 )
 
-from config.settings import setup_logger
+from config.settings import (
+    COMPACTION_ENABLED,
+    SEARCH_DEBOUNCE_SECONDS,
+    UI_WORKER_THREADS,
+    setup_logger,
+)
+from core.account_catalog import get_account_catalog
 from core.instagram_comparator import InstagramComparator
-from core.instagram_extractor import SimpleInstagramExtractor
+from core.prefetcher import SnapshotPrefetcher
+from utils.debounce import Debouncer
+from utils.memory_profiler import get_memory_profiler
+from utils.snapshot_cache import snapshot_version_key
+from utils.task_runner import LatestTaskRunner
+from utils.tracing import get_tracer, traced
 from utils.helpers import (
-    get_json_files_for_account,
     load_json_file,
     format_json_data,
     format_comparison_data,
@@ -40,28 +57,138 @@ from utils.helpers import (
 
 # =====================| DIRECTORIES |=====================
 logs_dir = Path(f"{Path.cwd()}/src/logs")
-logs_dir.mkdir(exist_ok=True)
-
 sessions_dir = Path(f"{Path.cwd()}/src/sessions")
-sessions_dir.mkdir(exist_ok=True)
-
 data_dir = Path(f"{Path.cwd()}/src/instagram_data")
-data_dir.mkdir(exist_ok=True)
+exports_dir = Path(f"{Path.cwd()}/src/exports")
+thumbnails_dir = Path(f"{Path.cwd()}/src/cache/thumbnails")
+
+# Hilo de compactación compartido por todas las ventanas del proceso
+compaction_stop = None
+compaction_lock = threading.Lock()
+
+# Fotos de perfil descargadas una sola vez y servidas desde disco (se crea al primer uso)
+thumbnail_cache = None
+thumbnail_cache_lock = threading.Lock()
+
+
+def init_app():
+    """Create the app directories and start logging; runs when the window opens, not on import"""
+    for directory in (logs_dir, sessions_dir, data_dir, exports_dir):
+        directory.mkdir(exist_ok=True)
 
-logger = setup_logger(logs_dir)
+    logger = setup_logger(logs_dir)
+
+    # Perfilado de memoria opcional; los resultados quedan junto al log
+    get_memory_profiler().configure(logs_dir, logger)
+
+    # Retención del historial (opcional): borra snapshots antiguos según RETENTION_TIERS
+    global compaction_stop
+    with compaction_lock:
+        if COMPACTION_ENABLED and compaction_stop is None:
+            from core.compaction import start_background_compaction
+            compaction_stop = start_background_compaction(data_dir, logger)
+    return logger
+
+
+def get_thumbnail_cache(logger):
+    """Thumbnail cache shared by every window of the process; its index is saved at exit"""
+    global thumbnail_cache
+    with thumbnail_cache_lock:
+        if thumbnail_cache is None:
+            from utils.thumbnail_cache import ThumbnailCache
+            thumbnail_cache = ThumbnailCache(thumbnails_dir, logger)
+            atexit.register(thumbnail_cache.close)
+        return thumbnail_cache
 
 
 # =====================| Flet App |======================
 def main(page: ft.Page):
+    logger = init_app()
+
     # =====================| Page Configuration |======================
     page.title = "Instagram Data Analyzer"
     page.vertical_alignment = ft.MainAxisAlignment.CENTER
     page.horizontal_alignment = ft.CrossAxisAlignment.CENTER
     page.padding = 20
 
-    def on_account_name_change(e):
-        """Se ejecuta cuando cambia el texto del campo de cuenta"""
+    # =====================| Background work |======================
+    # Carga y comparación fuera del hilo del manejador; un clic nuevo cancela el anterior
+    ui_executor = ThreadPoolExecutor(max_workers=UI_WORKER_THREADS)
+    load_runner = LatestTaskRunner(ui_executor, logger)
+    compare_runner = LatestTaskRunner(ui_executor, logger)
+
+    def avatar_lookup(snapshot_file, relation):
+        """Devuelve avatar_for(username, on_ready) si el snapshot tiene metadata de usuarios"""
+        from core.follower_metadata import get_snapshot_metadata
+        from utils.thumbnail_cache import AvatarSource
+
+        metadata = get_snapshot_metadata(snapshot_file)
+        if metadata is None:
+            return None
+        return AvatarSource(get_thumbnail_cache(logger), metadata.profile_pic_urls(relation))
+
+    # Precarga especulativa de los snapshots más recientes en Analyze Data
+    prefetcher = SnapshotPrefetcher(data_dir, logger)
+
+    def show_results_message(container, message, color=ft.Colors.GREY_600):
+        """Reemplaza el contenido de un contenedor de resultados por un mensaje"""
+        container.content = ft.Column(
+            [
+                ft.Text(
+                    message,
+                    size=16,
+                    color=color,
+                    text_align=ft.TextAlign.CENTER,
+                )
+            ]
+        )
+        container.update()
+
+    def start_export(export_function, source, base_name, fmt, status_text):
+        """Exporta en segundo plano y muestra el resultado junto al botón"""
+        out_path = exports_dir / f"{base_name}.{fmt}"
+        status_text.value = "⏳ Exportando..."
+        status_text.update()
+
+        def run_export():
+            try:
+                total = export_function(source, out_path, fmt)
+                status_text.value = f"✅ {total} filas exportadas a {out_path.name}"
+                logger.info(f"Exportado: {out_path}")
+            except Exception as e:
+                status_text.value = f"❌ Error exportando: {str(e)}"
+                logger.error(f"Error exportando {out_path}: {e}")
+            status_text.update()
+
+        ui_executor.submit(run_export)
+
+    # =====================| Account catalog |======================
+    # Se carga una sola vez en segundo plano; el autocompletado y los selectores leen de memoria
+    ui_executor.submit(get_account_catalog, data_dir, logger)
+
+    def account_catalog():
+        return get_account_catalog(data_dir, logger)
+
+    def update_account_suggestions(suggestions_row, account_name, on_pick):
+        """Muestra las cuentas que empiezan con el texto escrito"""
+        suggestions = [
+            name for name in account_catalog().suggest(account_name) if name != account_name
+        ]
+        suggestions_row.controls = [
+            ft.TextButton(f"@{name}", on_click=lambda e, name=name: on_pick(name))
+            for name in suggestions
+        ]
+        suggestions_row.update()
+
+    def pick_load_account(name):
+        account_name_field.value = name
+        account_name_field.update()
+        refresh_load_files()
+
+    def refresh_load_files():
+        """Actualiza sugerencias y archivos del campo de cuenta de load file"""
         account_name = account_name_field.value.strip()
+        update_account_suggestions(account_suggestions, account_name, pick_load_account)
 
         if not account_name:
             # Limpiar el multiselect si no hay texto
@@ -69,8 +196,8 @@ def main(page: ft.Page):
             file_selector.update()
             return
 
-        # Buscar archivos relacionados
-        json_files = get_json_files_for_account(account_name, data_dir, logger)
+        # Buscar archivos relacionados en el catálogo
+        json_files = account_catalog().files_for(account_name)
 
         # Actualizar las opciones del multiselect
         if json_files:
@@ -94,79 +221,48 @@ def main(page: ft.Page):
         file_selector.update()
         files_found_text.update()
 
+    debounced_load_refresh = Debouncer(SEARCH_DEBOUNCE_SECONDS, refresh_load_files)
+
+    def on_account_name_change(e):
+        """Se ejecuta cuando cambia el texto del campo de cuenta"""
+        debounced_load_refresh()
+
     def load_and_display_file(e):
         """Carga el archivo seleccionado y muestra los datos"""
         account_name = account_name_field.value.strip()
         selected_file = file_selector.value
 
         if not account_name:
-            load_results_container.content.controls[
-                0
-            ].value = "❌ Por favor, ingresa el nombre de la cuenta."
-            load_results_container.update()
+            show_results_message(
+                load_results_container, "❌ Por favor, ingresa el nombre de la cuenta."
+            )
             return
 
         if not selected_file:
-            load_results_container.content.controls[
-                0
-            ].value = "❌ Por favor, selecciona un archivo."
-            load_results_container.update()
+            show_results_message(
+                load_results_container, "❌ Por favor, selecciona un archivo."
+            )
             return
 
-        try:
-            # Mostrar mensaje de carga
-            load_results_container.content.controls[0].value = "⏳ Cargando archivo..."
-            load_results_container.update()
+        # Mostrar mensaje de carga y seguir en segundo plano
+        show_results_message(load_results_container, "⏳ Cargando archivo...")
+        load_runner.submit(load_file_task, selected_file)
 
+    @traced("ui.load_file")
+    def load_file_task(token, selected_file):
+        """Carga el archivo en un hilo y pinta los resultados por etapas"""
+        from components.export import export_controls_component
+        from core.exporter import available_formats, export_snapshot
+
+        try:
             # Cargar el archivo JSON
             data = load_json_file(selected_file)
+            if token.cancelled:
+                return
 
-            # Usar las mismas funciones que en data mining para mostrar los datos
+            # Etapa 1: encabezado y estadísticas
             formatted_info = format_json_data(data)
-            followers_text, following_text = create_expandable_lists(data)
-
-            # Crear contenedores para las pestañas
-            followers_container = ft.Container(
-                content=ft.Text(
-                    followers_text, size=11, color=ft.Colors.BLACK87, selectable=True
-                ),
-                padding=ft.padding.all(15),
-                bgcolor=ft.Colors.GREEN_50,
-                border_radius=8,
-                border=ft.border.all(1, ft.Colors.GREEN_200),
-                height=300,
-            )
-
-            following_container = ft.Container(
-                content=ft.Text(
-                    following_text, size=11, color=ft.Colors.BLACK87, selectable=True
-                ),
-                padding=ft.padding.all(15),
-                bgcolor=ft.Colors.ORANGE_50,
-                border_radius=8,
-                border=ft.border.all(1, ft.Colors.ORANGE_200),
-                height=300,
-            )
-
-            # Crear las pestañas
-            tabs_container = ft.Tabs(
-                selected_index=0,
-                animation_duration=300,
-                tabs=[
-                    ft.Tab(
-                        text=f"👥 Seguidores ({len(data.get('followers', []))})",
-                        content=followers_container,
-                    ),
-                    ft.Tab(
-                        text=f"➡️ Siguiendo ({len(data.get('following', []))})",
-                        content=following_container,
-                    ),
-                ],
-                height=350,
-            )
-
-            # Actualizar el contenedor de resultados
-            load_results_container.content = ft.Column(
+            results_column = ft.Column(
                 [
                     # Información del archivo cargado
                     ft.Container(
@@ -196,19 +292,69 @@ def main(page: ft.Page):
                         border=ft.border.all(1, ft.Colors.BLUE_200),
                         margin=ft.margin.only(bottom=15),
                     ),
-                    # Pestañas
-                    tabs_container,
+                    # Exportar el snapshot
+                    export_controls_component(
+                        available_formats(),
+                        lambda fmt, status_text: start_export(
+                            export_snapshot,
+                            selected_file,
+                            Path(selected_file).stem,
+                            fmt,
+                            status_text,
+                        ),
+                    ),
                 ],
                 scroll=ft.ScrollMode.AUTO,
                 spacing=10,
             )
+            load_results_container.content = results_column
+            load_results_container.update()
+            if token.cancelled:
+                return
 
-        except Exception as e:
-            error_message = f"❌ Error cargando el archivo: {str(e)}"
-            load_results_container.content.controls[0].value = error_message
-            load_results_container.content.controls[0].color = ft.Colors.RED_700
+            # Etapa 2: pestañas con los conteos (cada lista se construye al seleccionarla)
+            followers_list, following_list = create_expandable_lists(data)
+            tabs_container, build_selected_tab = lazy_tabs_component(
+                [
+                    (
+                        f"👥 Seguidores ({len(data.get('followers', []))})",
+                        lambda: user_list_component(
+                            followers_list["items"],
+                            followers_list["empty_text"],
+                            ft.Colors.GREEN_50,
+                            ft.Colors.GREEN_200,
+                            index_key=(snapshot_version_key(selected_file), "followers"),
+                            avatar_for=avatar_lookup(selected_file, "followers"),
+                        ),
+                    ),
+                    (
+                        f"➡️ Siguiendo ({len(data.get('following', []))})",
+                        lambda: user_list_component(
+                            following_list["items"],
+                            following_list["empty_text"],
+                            ft.Colors.ORANGE_50,
+                            ft.Colors.ORANGE_200,
+                            index_key=(snapshot_version_key(selected_file), "following"),
+                            avatar_for=avatar_lookup(selected_file, "following"),
+                        ),
+                    ),
+                ]
+            )
+            results_column.controls.append(tabs_container)
+            results_column.update()
+            if token.cancelled:
+                return
 
-        load_results_container.update()
+            # Etapa 3: primera página de la lista visible
+            build_selected_tab()
+
+        except Exception as e:
+            if not token.cancelled:
+                show_results_message(
+                    load_results_container,
+                    f"❌ Error cargando el archivo: {str(e)}",
+                    ft.Colors.RED_700,
+                )
 
     # =====================| Navigation Functions |======================
     def show_data_mine_section(e):
@@ -294,9 +440,17 @@ def main(page: ft.Page):
         page.add(analyze_layout)
         page.update()
 
-    def on_analyze_account_name_change(e):
-        """Se ejecuta cuando cambia el texto del campo de cuenta para análisis"""
+    def pick_analyze_account(name):
+        analyze_account_name_field.value = name
+        analyze_account_name_field.update()
+        refresh_analyze_files()
+
+    def refresh_analyze_files():
+        """Actualiza sugerencias y archivos del campo de cuenta para análisis"""
         account_name = analyze_account_name_field.value.strip()
+        update_account_suggestions(
+            analyze_account_suggestions, account_name, pick_analyze_account
+        )
 
         if not account_name:
             # Limpiar los multiselects si no hay texto
@@ -304,6 +458,7 @@ def main(page: ft.Page):
             analyze_file2_selector.options = []
             analyze_file1_selector.value = None
             analyze_file2_selector.value = None
+            prefetcher.cancel()
             analyze_files_found_text.value = (
                 "Ingresa un nombre de cuenta para buscar archivos"
             )
@@ -315,42 +470,8 @@ def main(page: ft.Page):
             analyze_files_found_text.update()
             return
 
-        # Buscar archivos relacionados usando la clase comparator
-        comparator = InstagramComparator(data_dir, logger)
-        json_files_paths = comparator.find_account_files(account_name)
-
-        # Convertir a formato similar al de load file
-        json_files = []
-        for file_path in json_files_paths:
-            filename = Path(file_path).name
-            try:
-                # Extraer timestamp del nombre del archivo
-                timestamp_part = filename.replace(f"{account_name}_data_", "").replace(
-                    ".json", ""
-                )
-                if len(timestamp_part) == 12:  # YYYYMMDDHHMM
-                    year = timestamp_part[:4]
-                    month = timestamp_part[4:6]
-                    day = timestamp_part[6:8]
-                    hour = timestamp_part[8:10]
-                    minute = timestamp_part[10:12]
-                    formatted_date = f"{day}/{month}/{year} {hour}:{minute}"
-                    display_name = f"{formatted_date} - {filename}"
-                else:
-                    display_name = filename
-            except Exception:
-                display_name = filename
-
-            json_files.append(
-                {
-                    "path": file_path,
-                    "display_name": display_name,
-                    "timestamp": timestamp_part if "timestamp_part" in locals() else "",
-                }
-            )
-
-        # Ordenar por timestamp (más reciente primero)
-        json_files.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
+        # Buscar archivos relacionados en el catálogo (más reciente primero)
+        json_files = account_catalog().files_for(account_name)
 
         # Actualizar las opciones de ambos multiselects
         if json_files:
@@ -385,11 +506,23 @@ def main(page: ft.Page):
         analyze_file1_selector.value = None
         analyze_file2_selector.value = None
 
+        # Precargar en segundo plano los dos más recientes, el par que se suele comparar
+        if len(json_files) >= 2:
+            prefetcher.prefetch([file_info["path"] for file_info in json_files])
+        else:
+            prefetcher.cancel()
+
         # Actualizar todos los componentes al final, en el orden correcto
         analyze_files_found_text.update()
         analyze_file1_selector.update()
         analyze_file2_selector.update()
 
+    debounced_analyze_refresh = Debouncer(SEARCH_DEBOUNCE_SECONDS, refresh_analyze_files)
+
+    def on_analyze_account_name_change(e):
+        """Se ejecuta cuando cambia el texto del campo de cuenta para análisis"""
+        debounced_analyze_refresh()
+
     def perform_comparison(e):
         """Realiza la comparación entre los dos archivos seleccionados"""
         account_name = analyze_account_name_field.value.strip()
@@ -398,17 +531,15 @@ def main(page: ft.Page):
 
         # Validaciones
         if not account_name:
-            analyze_results_container.content.controls[
-                0
-            ].value = "❌ Por favor, ingresa el nombre de la cuenta."
-            analyze_results_container.update()
+            show_results_message(
+                analyze_results_container, "❌ Por favor, ingresa el nombre de la cuenta."
+            )
             return
 
         if not file1_key or not file2_key:
-            analyze_results_container.content.controls[
-                0
-            ].value = "❌ Por favor, selecciona ambos archivos para comparar."
-            analyze_results_container.update()
+            show_results_message(
+                analyze_results_container, "❌ Por favor, selecciona ambos archivos para comparar."
+            )
             return
 
         # Extraer las rutas reales de los archivos desde los keys
@@ -424,141 +555,226 @@ def main(page: ft.Page):
         )
 
         if file1 == file2:
-            analyze_results_container.content.controls[
-                0
-            ].value = "❌ Por favor, selecciona dos archivos diferentes."
-            analyze_results_container.update()
+            show_results_message(
+                analyze_results_container, "❌ Por favor, selecciona dos archivos diferentes."
+            )
             return
 
-        try:
-            # Mostrar mensaje de procesamiento
-            analyze_results_container.content.controls[
-                0
-            ].value = "⏳ Analizando datos..."
-            analyze_results_container.update()
+        # Mostrar mensaje de procesamiento y seguir en segundo plano
+        show_results_message(analyze_results_container, "⏳ Analizando datos...")
+        compare_runner.submit(compare_files_task, file1, file2)
+
+    @traced("ui.compare_files")
+    def compare_files_task(token, file1, file2):
+        """Compara los archivos en un hilo y pinta los resultados por etapas"""
+        from components.export import export_controls_component
+        from core.exporter import available_formats, export_comparison
 
-            # Realizar comparación
-            comparator = InstagramComparator(data_dir, logger)
-            comparison_result = comparator.compare_data(file1, file2)
+        try:
+            # Usar la comparación precargada si coincide con los archivos elegidos
+            comparison_result = prefetcher.get_comparison(file1, file2, cancel_token=token)
+            if not comparison_result:
+                comparator = InstagramComparator(data_dir, logger)
+                comparison_result = comparator.compare_data(file1, file2, cancel_token=token)
+            if token.cancelled:
+                return
 
             if not comparison_result:
-                analyze_results_container.content.controls[
-                    0
-                ].value = "❌ Error al comparar los archivos. Verifica que sean de la misma cuenta."
-                analyze_results_container.update()
+                show_results_message(
+                    analyze_results_container,
+                    "❌ Error al comparar los archivos. Verifica que sean de la misma cuenta.",
+                )
                 return
 
-            # Formatear datos
+            # Etapa 1: resumen de la comparación
             formatted_info = format_comparison_data(comparison_result)
+            results_column = ft.Column(
+                [
+                    # Información de comparación
+                    ft.Container(
+                        content=ft.Text(
+                            formatted_info,
+                            size=12,
+                            color=ft.Colors.BLACK87,
+                            font_family="monospace",
+                        ),
+                        padding=ft.padding.all(15),
+                        border_radius=8,
+                        bgcolor=ft.Colors.BLUE_50,
+                        border=ft.border.all(1, ft.Colors.BLUE_200),
+                        margin=ft.margin.only(bottom=15),
+                    ),
+                    # Exportar la comparación
+                    export_controls_component(
+                        available_formats(),
+                        lambda fmt, status_text: start_export(
+                            export_comparison,
+                            comparison_result,
+                            f"{Path(file1).stem}_vs_{Path(file2).stem}",
+                            fmt,
+                            status_text,
+                        ),
+                    ),
+                ],
+                scroll=ft.ScrollMode.AUTO,
+                spacing=10,
+            )
+            analyze_results_container.content = results_column
+            analyze_results_container.update()
+            if token.cancelled:
+                return
+
+            # Etapa 2: pestañas con los conteos
             comparison_lists = create_comparison_lists(comparison_result)
 
-            # Crear contenedores para las pestañas
-            def create_tab_container(content, bg_color, border_color):
-                return ft.Container(
-                    content=ft.Text(
-                        content, size=11, color=ft.Colors.BLACK87, selectable=True
-                    ),
-                    padding=ft.padding.all(15),
-                    bgcolor=bg_color,
-                    border_radius=8,
-                    border=ft.border.all(1, border_color),
-                    height=300,
+            # Snapshot y relación de donde sale la foto de cada lista
+            avatar_sources = {
+                'new_followers': (file2, "followers"),
+                'lost_followers': (file1, "followers"),
+                'new_following': (file2, "following"),
+                'unfollowed': (file1, "following"),
+                'mutual_follows': (file2, "followers"),
+                'follows_not_followed': (file2, "following"),
+            }
+
+            # Constructores diferidos de las pestañas
+            def create_tab_builder(list_name, bg_color, border_color):
+                list_source = comparison_lists[list_name]
+                return lambda: user_list_component(
+                    list_source["items"],
+                    list_source["empty_text"],
+                    bg_color,
+                    border_color,
+                    index_key=(snapshot_version_key(file1), snapshot_version_key(file2), list_name),
+                    avatar_for=avatar_lookup(*avatar_sources[list_name]),
                 )
 
-            # Crear las pestañas con los diferentes análisis
-            tabs_container = ft.Tabs(
-                selected_index=0,
-                animation_duration=300,
-                tabs=[
-                    ft.Tab(
-                        text=f"➕ Nuevos Seguidores ({len(comparison_result['changes']['new_followers'])})",
-                        content=create_tab_container(
-                            comparison_lists["new_followers"],
+            # Crear las pestañas con los diferentes análisis (construidas al seleccionarlas)
+            tabs_container, build_selected_tab = lazy_tabs_component(
+                [
+                    (
+                        f"➕ Nuevos Seguidores ({len(comparison_result['changes']['new_followers'])})",
+                        create_tab_builder(
+                            "new_followers",
                             ft.Colors.GREEN_50,
                             ft.Colors.GREEN_200,
                         ),
                     ),
-                    ft.Tab(
-                        text=f"➖ Seguidores Perdidos ({len(comparison_result['changes']['lost_followers'])})",
-                        content=create_tab_container(
-                            comparison_lists["lost_followers"],
+                    (
+                        f"➖ Seguidores Perdidos ({len(comparison_result['changes']['lost_followers'])})",
+                        create_tab_builder(
+                            "lost_followers",
                             ft.Colors.RED_50,
                             ft.Colors.RED_200,
                         ),
                     ),
-                    ft.Tab(
-                        text=f"➕ Nuevos Seguidos ({len(comparison_result['changes']['new_following'])})",
-                        content=create_tab_container(
-                            comparison_lists["new_following"],
+                    (
+                        f"➕ Nuevos Seguidos ({len(comparison_result['changes']['new_following'])})",
+                        create_tab_builder(
+                            "new_following",
                             ft.Colors.BLUE_50,
                             ft.Colors.BLUE_200,
                         ),
                     ),
-                    ft.Tab(
-                        text=f"➖ Dejó de Seguir ({len(comparison_result['changes']['unfollowed'])})",
-                        content=create_tab_container(
-                            comparison_lists["unfollowed"],
+                    (
+                        f"➖ Dejó de Seguir ({len(comparison_result['changes']['unfollowed'])})",
+                        create_tab_builder(
+                            "unfollowed",
                             ft.Colors.ORANGE_50,
                             ft.Colors.ORANGE_200,
                         ),
                     ),
-                    ft.Tab(
-                        text=f"💫 Mutuos ({len(comparison_result['current_relationships']['mutual_follows'])})",
-                        content=create_tab_container(
-                            comparison_lists["mutual_follows"],
+                    (
+                        f"💫 Mutuos ({len(comparison_result['current_relationships']['mutual_follows'])})",
+                        create_tab_builder(
+                            "mutual_follows",
                             ft.Colors.PURPLE_50,
                             ft.Colors.PURPLE_200,
                         ),
                     ),
-                    ft.Tab(
-                        text=f"🔄 Sin Reciprocidad ({len(comparison_result['current_relationships']['follows_but_not_followed'])})",
-                        content=create_tab_container(
-                            comparison_lists["follows_not_followed"],
+                    (
+                        f"🔄 Sin Reciprocidad ({len(comparison_result['current_relationships']['follows_but_not_followed'])})",
+                        create_tab_builder(
+                            "follows_not_followed",
                             ft.Colors.YELLOW_50,
                             ft.Colors.YELLOW_200,
                         ),
                     ),
-                ],
-                height=350,
+                ]
             )
 
-            # Actualizar contenedor de resultados
-            analyze_results_container.content = ft.Column(
-                [
-                    # Información de comparación
-                    ft.Container(
-                        content=ft.Text(
-                            formatted_info,
-                            size=12,
-                            color=ft.Colors.BLACK87,
-                            font_family="monospace",
-                        ),
-                        padding=ft.padding.all(15),
-                        border_radius=8,
-                        bgcolor=ft.Colors.BLUE_50,
-                        border=ft.border.all(1, ft.Colors.BLUE_200),
-                        margin=ft.margin.only(bottom=15),
-                    ),
-                    # Pestañas con análisis detallado
-                    tabs_container,
-                ],
-                scroll=ft.ScrollMode.AUTO,
-                spacing=10,
-            )
+            results_column.controls.append(tabs_container)
+            results_column.update()
+            if token.cancelled:
+                return
+
+            # Etapa 3: primera página de la lista visible
+            build_selected_tab()
 
         except Exception as e:
-            error_message = f"❌ Error durante el análisis: {str(e)}"
-            analyze_results_container.content.controls[0].value = error_message
-            analyze_results_container.content.controls[0].color = ft.Colors.RED_700
             logger.error(f"Error en comparación: {e}")
+            if not token.cancelled:
+                show_results_message(
+                    analyze_results_container,
+                    f"❌ Error durante el análisis: {str(e)}",
+                    ft.Colors.RED_700,
+                )
+
+    def show_performance_section(e):
+        from components.performance import performance_component
 
-        analyze_results_container.update()
+        page.clean()
+
+        back_button = ft.ElevatedButton(
+            "← Volver al Menú",
+            on_click=show_main_menu_section,
+            bgcolor=ft.Colors.GREY_500,
+            color=ft.Colors.WHITE,
+        )
+
+        # -> Layout de rendimiento (tiempos medidos desde que arrancó la app)
+        performance_layout = ft.Column(
+            [
+                back_button,
+                ft.Container(height=15),
+                performance_component(
+                    get_tracer().summary(),
+                    get_memory_profiler().recent_records(),
+                    get_memory_profiler().enabled,
+                    show_performance_section,
+                    export_performance,
+                    reset_performance,
+                ),
+            ]
+        )
+
+        page.add(performance_layout)
+        page.update()
+
+    def export_performance(fmt, status_text):
+        """Guarda los histogramas en exports/ como JSON o texto de Prometheus"""
+        tracer = get_tracer()
+        out_path = exports_dir / f"performance_{datetime.now().strftime('%Y%m%d%H%M%S')}.{fmt}"
+        try:
+            content = tracer.to_json() if fmt == "json" else tracer.to_prometheus()
+            out_path.write_text(content, encoding="utf-8")
+            status_text.value = f"✅ Guardado en {out_path.name}"
+            logger.info(f"Métricas exportadas: {out_path}")
+        except Exception as e:
+            status_text.value = f"❌ Error exportando: {str(e)}"
+            logger.error(f"Error exportando métricas: {e}")
+        status_text.update()
+
+    def reset_performance(e):
+        get_tracer().reset()
+        show_performance_section(e)
 
     def show_main_menu_section(e):
         page.clean()
         page.add(main_menu)
         page.update()
 
+    @traced("ui.data_mining")
     def perform_data_mining(e):
         username = username_field.value.strip()
         password = password_field.value.strip()
@@ -575,7 +791,9 @@ def main(page: ft.Page):
         results_container.content.controls[0].value = "Procesando..."
         results_container.update()
 
-        # -> Initialize Instagram extractor
+        # -> Initialize Instagram extractor (instagrapi se importa solo aquí)
+        from core.instagram_extractor import SimpleInstagramExtractor
+
         extractor = SimpleInstagramExtractor(sessions_dir, data_dir, logger)
 
         # -> Login
@@ -586,54 +804,49 @@ def main(page: ft.Page):
             results_container.update()
             return
 
-        # -> Extract data
-        extraction_result = extractor.extract_account(objective)
+        build_selected_tab = None
+
+        # -> Extract data (alerts fire while pages arrive)
+        alerts = []
+        extraction_result = extractor.extract_account(objective, on_alert=alerts.append)
         if extraction_result and extraction_result.get("success"):
             data = extraction_result.get("data", {})
+            changes = extraction_result.get("changes")
 
             # Formatear los datos
             formatted_info = format_json_data(data)
-            followers_text, following_text = create_expandable_lists(data)
-
-            followers_container = ft.Container(
-                content=ft.Text(
-                    followers_text, size=11, color=ft.Colors.BLACK87, selectable=True
-                ),
-                padding=ft.padding.all(15),
-                bgcolor=ft.Colors.GREEN_50,
-                border_radius=8,
-                border=ft.border.all(1, ft.Colors.GREEN_200),
-                height=300,  # Altura fija
-                # Removemos el scroll del contenedor individual
-            )
-
-            following_container = ft.Container(
-                content=ft.Text(
-                    following_text, size=11, color=ft.Colors.BLACK87, selectable=True
-                ),
-                padding=ft.padding.all(15),
-                bgcolor=ft.Colors.ORANGE_50,
-                border_radius=8,
-                border=ft.border.all(1, ft.Colors.ORANGE_200),
-                height=300,  # Altura fija
-                # Removemos el scroll del contenedor individual
-            )
+            followers_list, following_list = create_expandable_lists(data)
 
-            # Crear las pestañas de manera más simple
-            tabs_container = ft.Tabs(
-                selected_index=0,
-                animation_duration=300,
-                tabs=[
-                    ft.Tab(
-                        text=f"👥 Seguidores ({len(data.get('followers', []))})",
-                        content=followers_container,
+            # Crear las pestañas (cada lista se construye al seleccionarla)
+            tabs_container, build_selected_tab = lazy_tabs_component(
+                [
+                    (
+                        f"👥 Seguidores ({len(data.get('followers', []))})",
+                        lambda: user_list_component(
+                            followers_list["items"],
+                            followers_list["empty_text"],
+                            ft.Colors.GREEN_50,
+                            ft.Colors.GREEN_200,
+                            index_key=(snapshot_version_key(extraction_result["filepath"]), "followers"),
+                            avatar_for=avatar_lookup(
+                                extraction_result["filepath"], "followers"
+                            ),
+                        ),
                     ),
-                    ft.Tab(
-                        text=f"➡️ Siguiendo ({len(data.get('following', []))})",
-                        content=following_container,
+                    (
+                        f"➡️ Siguiendo ({len(data.get('following', []))})",
+                        lambda: user_list_component(
+                            following_list["items"],
+                            following_list["empty_text"],
+                            ft.Colors.ORANGE_50,
+                            ft.Colors.ORANGE_200,
+                            index_key=(snapshot_version_key(extraction_result["filepath"]), "following"),
+                            avatar_for=avatar_lookup(
+                                extraction_result["filepath"], "following"
+                            ),
+                        ),
                     ),
-                ],
-                height=350,  # Altura total del tabs
+                ]
             )
 
             # Actualizar el contenedor de resultados
@@ -659,11 +872,38 @@ def main(page: ft.Page):
                 scroll=ft.ScrollMode.AUTO,  # Solo un scroll en el contenedor principal
                 spacing=10,
             )
+
+            # Reporte de cambios calculado durante la extracción
+            if changes:
+                alerts_text = "\n".join(
+                    f"⚠️ {alert['stat']}: {alert['value']} (umbral {alert['threshold']})"
+                    for alert in alerts
+                )
+                results_container.content.controls.insert(
+                    1,
+                    ft.Container(
+                        content=ft.Text(
+                            f"{alerts_text}\n{format_comparison_data(changes)}" if alerts_text else format_comparison_data(changes),
+                            size=12,
+                            color=ft.Colors.BLACK87,
+                            font_family="monospace",
+                        ),
+                        padding=ft.padding.all(15),
+                        border_radius=8,
+                        bgcolor=ft.Colors.AMBER_50 if alerts else ft.Colors.PURPLE_50,
+                        border=ft.border.all(1, ft.Colors.AMBER_200 if alerts else ft.Colors.PURPLE_200),
+                        margin=ft.margin.only(bottom=15),
+                    ),
+                )
         else:
             results_container.content.controls[0].value = "Error extrayendo datos."
 
         results_container.update()
 
+        # Primer pintado listo: construir la pestaña visible
+        if build_selected_tab:
+            build_selected_tab()
+
     # =====================| Fields to data mining section |======================
     # Input fields
     username_field = username_field_component()
@@ -682,6 +922,9 @@ def main(page: ft.Page):
     # Campo para el nombre de la cuenta
     account_name_field = account_name_field_component(on_account_name_change)
 
+    # Sugerencias de cuentas (autocompletado)
+    account_suggestions = account_suggestions_component()
+
     # Texto para mostrar cuántos archivos se encontraron
     files_found_text = files_found_text_component()
 
@@ -693,7 +936,11 @@ def main(page: ft.Page):
 
     # Formulario de load file
     load_form_container = load_form_container_component(
-        account_name_field, files_found_text, file_selector, load_and_display_file
+        account_name_field,
+        account_suggestions,
+        files_found_text,
+        file_selector,
+        load_and_display_file,
     )
     # =====================| Analyze Data Form Components |======================
     # Campo para el nombre de la cuenta
@@ -701,6 +948,9 @@ def main(page: ft.Page):
         on_analyze_account_name_change
     )
 
+    # Sugerencias de cuentas (autocompletado)
+    analyze_account_suggestions = analyze_account_suggestions_component()
+
     # Texto para mostrar cuántos archivos se encontraron
     analyze_files_found_text = analyze_files_found_text_component()
 
@@ -716,6 +966,7 @@ def main(page: ft.Page):
     # Formulario de analyze data
     analyze_form_container = analyze_form_container_component(
         analyze_account_name_field,
+        analyze_account_suggestions,
         analyze_files_found_text,
         analyze_file1_selector,
         analyze_file2_selector,
@@ -724,7 +975,10 @@ def main(page: ft.Page):
 
     # =====================| Main Menu Layout |======================
     main_menu = main_menu_component(
-        show_data_mine_section, show_load_file_section, show_analyze_data_section
+        show_data_mine_section,
+        show_load_file_section,
+        show_analyze_data_section,
+        show_performance_section,
     )
 
     # Show main menu initially
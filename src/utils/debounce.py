@@ -0,0 +1,25 @@
+import threading
+
+
+class Debouncer:
+    """Run a callback only after calls have stopped for `delay` seconds"""
+
+    def __init__(self, delay, callback):
+        self.delay = delay
+        self.callback = callback
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def __call__(self, *args, **kwargs):
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self.callback, args, kwargs)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def cancel(self):
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
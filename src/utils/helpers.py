@@ -1,6 +1,14 @@
 import json
+from pathlib import Path
 
+from utils.snapshot_cache import UNCHANGED_MARKER_SUFFIX, is_unchanged_marker, snapshot_cache
+from utils.memory_profiler import memory_profiled
+from utils.tracing import traced
 
+# Archivos que representan un snapshot: el JSON completo o un marcador "sin cambios"
+SNAPSHOT_SUFFIXES = (".json", UNCHANGED_MARKER_SUFFIX)
+
+@traced("helpers.get_json_files_for_account")
 def get_json_files_for_account(account_name, data_dir, logger):
         """ Search for all JSON files related to a specific account """
         if not account_name.strip():
@@ -8,15 +16,15 @@ def get_json_files_for_account(account_name, data_dir, logger):
 
         try:
             json_files = []
-            # Search pattern: account_data_YYYYMMDDHHMM.json
-            for file_path in data_dir.glob("*.json"):
+            # Search pattern: account/YYYY/MM/account_data_YYYYMMDDHHMM.json (or .unchanged marker)
+            for file_path in find_snapshot_files(data_dir, account_name):
                 filename = file_path.name
                 # Check if the file corresponds to the searched account
                 if filename.startswith(f"{account_name}_data_"):
                     # Extract data from filename
                     timestamp_part = ""
                     try:
-                        timestamp_part = filename.replace(f"{account_name}_data_", "").replace(".json", "")
+                        timestamp_part = file_path.stem.replace(f"{account_name}_data_", "")
                         # Format the timestamp part to a readable date
                         if len(timestamp_part) == 12:  # YYYYMMDDHHMM
                             year = timestamp_part[:4]
@@ -25,7 +33,9 @@ def get_json_files_for_account(account_name, data_dir, logger):
                             hour = timestamp_part[8:10]
                             minute = timestamp_part[10:12]
                             formatted_date = f"{day}/{month}/{year} {hour}:{minute}"
-                            
+                            if is_unchanged_marker(file_path):
+                                formatted_date += " (sin cambios)"
+
                             json_files.append({
                                 'filename': filename,
                                 'path': str(file_path),
@@ -51,11 +61,13 @@ def get_json_files_for_account(account_name, data_dir, logger):
             return []
 
 
+@traced("helpers.load_json_file")
+@memory_profiled("load_json_file")
 def load_json_file(file_path: str) -> dict:
         """Load and validate a JSON file"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            # Read through the shared cache so views don't re-parse the same file
+            data = snapshot_cache.get(file_path)
 
             # Validate required keys
             required_keys = ['account', 'followers', 'following', 'extraction_date']
@@ -71,6 +83,7 @@ def load_json_file(file_path: str) -> dict:
             raise ValueError(f"Error cargando el archivo: {str(e)}")
 
 
+@traced("helpers.format_json_data")
 def format_json_data(data: dict) -> str:
         account_info = data.get('account_info', {})
         stats = data.get('stats', {})
@@ -101,6 +114,7 @@ def format_json_data(data: dict) -> str:
         return formatted_text
 
 
+@traced("helpers.format_comparison_data")
 def format_comparison_data(comparison: dict) -> str:
         """Formatea los datos de comparación para mostrar"""
         info = comparison['comparison_info']
@@ -147,53 +161,104 @@ def format_comparison_data(comparison: dict) -> str:
         return formatted_text
 
 
+@traced("helpers.create_comparison_lists")
 def create_comparison_lists(comparison):
     """Crea las listas para mostrar en las pestañas de comparación"""
     changes = comparison['changes']
     relationships = comparison['current_relationships']
-    
-    # Nuevos seguidores
-    new_followers_text = "\n".join([f"• @{username}" for username in changes['new_followers']]) if changes['new_followers'] else "No hay nuevos seguidores"
-    
-    # Seguidores perdidos
-    lost_followers_text = "\n".join([f"• @{username}" for username in changes['lost_followers']]) if changes['lost_followers'] else "No se perdieron seguidores"
-    
-    # Nuevos seguidos
-    new_following_text = "\n".join([f"• @{username}" for username in changes['new_following']]) if changes['new_following'] else "No hay nuevos seguidos"
-    
-    # Dejó de seguir
-    unfollowed_text = "\n".join([f"• @{username}" for username in changes['unfollowed']]) if changes['unfollowed'] else "No dejó de seguir a nadie"
-    
-    # Seguimiento mutuo
-    mutual_follows_text = "\n".join([f"• @{username}" for username in relationships['mutual_follows']]) if relationships['mutual_follows'] else "No hay seguimiento mutuo"
-    
-    # Sigue pero no lo siguen
-    follows_not_followed_text = "\n".join([f"• @{username}" for username in relationships['follows_but_not_followed']]) if relationships['follows_but_not_followed'] else "Todos los que sigue lo siguen de vuelta"
-    
+
+    # Cada lista se pagina en la vista; aquí solo se arma la fuente de datos
     return {
-        'new_followers': new_followers_text,
-        'lost_followers': lost_followers_text,
-        'new_following': new_following_text,
-        'unfollowed': unfollowed_text,
-        'mutual_follows': mutual_follows_text,
-        'follows_not_followed': follows_not_followed_text
+        'new_followers': {'items': changes['new_followers'], 'empty_text': "No hay nuevos seguidores"},
+        'lost_followers': {'items': changes['lost_followers'], 'empty_text': "No se perdieron seguidores"},
+        'new_following': {'items': changes['new_following'], 'empty_text': "No hay nuevos seguidos"},
+        'unfollowed': {'items': changes['unfollowed'], 'empty_text': "No dejó de seguir a nadie"},
+        'mutual_follows': {'items': relationships['mutual_follows'], 'empty_text': "No hay seguimiento mutuo"},
+        'follows_not_followed': {
+            'items': relationships['follows_but_not_followed'],
+            'empty_text': "Todos los que sigue lo siguen de vuelta",
+        },
     }
 
 
+@traced("helpers.create_expandable_lists")
 def create_expandable_lists(data):
         followers = data.get('followers', [])
         following = data.get('following', [])
-        
-        # Mostrar todos los seguidores (no solo preview)
-        if followers:
-            followers_text = "\n".join([f"• @{username}" for username in followers])
-        else:
-            followers_text = "No hay seguidores disponibles"
 
-        # Mostrar todos los siguiendo (no solo preview)  
-        if following:
-            following_text = "\n".join([f"• @{username}" for username in following])
+        followers_list = {'items': followers, 'empty_text': "No hay seguidores disponibles"}
+        following_list = {'items': following, 'empty_text': "No hay usuarios seguidos disponibles"}
+
+        return followers_list, following_list
+
+
+def get_list_page(items, start, page_size) -> list:
+        """Format one page of usernames for a list view"""
+        return [f"• @{username}" for username in items[start:start + page_size]]
+
+
+def snapshot_timestamp(file_path, account_name) -> str:
+        """Return the YYYYMMDDHHMM part of a snapshot filename, or "" if it has none"""
+        filename = Path(file_path).name
+        timestamp_part = Path(filename).stem.replace(f"{account_name}_data_", "")
+        if len(timestamp_part) == 12 and timestamp_part.isdigit():
+            return timestamp_part
+        return ""
+
+
+def snapshot_dir_for(data_dir, account_name, timestamp) -> Path:
+        """Directory of a snapshot in the sharded layout: data_dir/account/YYYY/MM"""
+        return Path(data_dir) / account_name / timestamp[:4] / timestamp[4:6]
+
+
+def find_snapshot_files(data_dir, account_name) -> list:
+        """Snapshot files (and unchanged markers) of one account, oldest first.
+
+        Only the account's own directory is listed; files still in the old
+        flat layout (directly in data_dir) are included until migrated.
+        """
+        data_dir = Path(data_dir)
+        files = []
+        for suffix in SNAPSHOT_SUFFIXES:
+            pattern = f"{account_name}_data_*{suffix}"
+            files.extend((data_dir / account_name).glob(f"*/*/{pattern}"))
+            files.extend(data_dir.glob(pattern))
+        files.sort(key=lambda file_path: file_path.name)
+        return files
+
+
+def iter_all_snapshot_files(data_dir):
+        """(account, path) for every snapshot in data_dir, sharded or flat"""
+        data_dir = Path(data_dir)
+        for suffix in SNAPSHOT_SUFFIXES:
+            for pattern in (f"*/*/*/*_data_*{suffix}", f"*_data_*{suffix}"):
+                for file_path in data_dir.glob(pattern):
+                    yield file_path.name.rsplit("_data_", 1)[0], file_path
+
+
+def snapshot_sidecar_path(file_path, kind) -> Path:
+        """Path of a file stored next to a snapshot, e.g. x_data_202401010000.sketch"""
+        return Path(file_path).with_suffix(f".{kind}")
+
+
+def describe_snapshot_file(file_path, account_name) -> dict:
+        """Build the file info shown in the file selectors for one snapshot"""
+        filename = Path(file_path).name
+        timestamp_part = snapshot_timestamp(file_path, account_name)
+        if timestamp_part:
+            year = timestamp_part[:4]
+            month = timestamp_part[4:6]
+            day = timestamp_part[6:8]
+            hour = timestamp_part[8:10]
+            minute = timestamp_part[10:12]
+            unchanged = " (sin cambios)" if is_unchanged_marker(file_path) else ""
+            display_name = f"{day}/{month}/{year} {hour}:{minute}{unchanged} - {filename}"
         else:
-            following_text = "No hay usuarios seguidos disponibles"
-        
-        return followers_text, following_text
\ No newline at end of file
+            display_name = filename
+
+        return {
+            'filename': filename,
+            'path': str(file_path),
+            'display_name': display_name,
+            'timestamp': timestamp_part
+        }
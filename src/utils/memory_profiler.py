@@ -0,0 +1,145 @@
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+from config.settings import MEMORY_BUDGET_BYTES, MEMORY_PROFILE_TOP_MODULES, MEMORY_PROFILING
+
+MEMORY_PROFILE_FILENAME = "memory_profile.jsonl"
+
+
+def module_name(filename) -> str:
+    """Dotted module name of a source file, relative to the longest matching sys.path entry"""
+    for entry in sorted((path for path in sys.path if path), key=len, reverse=True):
+        prefix = os.path.join(os.path.abspath(entry), "")
+        if filename.startswith(prefix):
+            relative = os.path.splitext(filename[len(prefix):])[0]
+            return relative.replace(os.sep, ".").removesuffix(".__init__")
+    return filename
+
+
+class MemoryProfiler:
+    """Opt-in peak/retained allocation accounting per operation using tracemalloc.
+
+    One operation is recorded at a time: operations started while another is
+    being profiled (a load inside a comparison, or work on another thread)
+    count towards that operation's numbers instead of getting their own.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.budget_bytes = MEMORY_BUDGET_BYTES
+        self.output_path = None
+        self.logger = logging.getLogger(__name__)
+        self._records = deque(maxlen=50)
+        self._lock = threading.Lock()
+        self._active = False
+
+    def configure(self, logs_dir, logger, enabled=MEMORY_PROFILING, budget_bytes=MEMORY_BUDGET_BYTES):
+        self.enabled = enabled
+        self.budget_bytes = budget_bytes
+        self.output_path = Path(logs_dir) / MEMORY_PROFILE_FILENAME
+        self.logger = logger
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.logger.info(f"Perfilado de memoria activo, resultados en {self.output_path}")
+
+    @contextmanager
+    def profile(self, operation, **context):
+        with self._lock:
+            outermost = self.enabled and not self._active
+            if outermost:
+                self._active = True
+        if not outermost:
+            yield
+            return
+
+        try:
+            tracemalloc.reset_peak()
+            before = tracemalloc.take_snapshot()
+            start_current, _ = tracemalloc.get_traced_memory()
+            started = time.perf_counter()
+            error = None
+            try:
+                yield
+            except BaseException as e:
+                error = str(e)
+                raise
+            finally:
+                seconds = time.perf_counter() - started
+                current, peak = tracemalloc.get_traced_memory()
+                after = tracemalloc.take_snapshot()
+                self._record(operation, context, seconds, peak - start_current,
+                             current - start_current, before, after, error)
+        finally:
+            with self._lock:
+                self._active = False
+
+    def profiled(self, operation):
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.profile(operation):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _record(self, operation, context, seconds, peak_bytes, retained_bytes, before, after, error):
+        by_module = {}
+        for stat in after.compare_to(before, "filename"):
+            name = module_name(stat.traceback[0].filename)
+            by_module[name] = by_module.get(name, 0) + stat.size_diff
+        top_modules = sorted(by_module.items(), key=lambda item: item[1], reverse=True)[:MEMORY_PROFILE_TOP_MODULES]
+
+        record = {
+            "operation": operation,
+            **context,
+            "ended_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "seconds": round(seconds, 6),
+            "peak_bytes": peak_bytes,
+            "retained_bytes": retained_bytes,
+            "over_budget": peak_bytes > self.budget_bytes,
+            "by_module": [{"module": name, "retained_bytes": size} for name, size in top_modules],
+            "error": error,
+        }
+        with self._lock:
+            self._records.append(record)
+
+        if record["over_budget"]:
+            self.logger.warning(
+                f"⚠️ {operation} superó el presupuesto de memoria: "
+                f"pico {peak_bytes / 1024 / 1024:.1f} MB > {self.budget_bytes / 1024 / 1024:.1f} MB"
+            )
+        try:
+            with open(self.output_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except Exception as e:
+            self.logger.warning(f"No se pudo guardar el perfil de memoria: {e}")
+
+    def recent_records(self) -> list:
+        with self._lock:
+            return list(self._records)
+
+
+# Perfilador compartido por todo el proceso (desactivado hasta configure)
+memory_profiler = MemoryProfiler()
+
+
+def profile_memory(operation, **context):
+    """Context manager recording the memory of an operation when profiling is enabled"""
+    return memory_profiler.profile(operation, **context)
+
+
+def memory_profiled(operation):
+    return memory_profiler.profiled(operation)
+
+
+def get_memory_profiler() -> MemoryProfiler:
+    return memory_profiler
@@ -0,0 +1,69 @@
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+
+# Índices que se mantienen en memoria (uno por lista de snapshot/comparación)
+MAX_CACHED_INDEXES = 32
+
+
+class IndexRange:
+    """Read-only sequence view over a contiguous slice of a PrefixIndex"""
+
+    def __init__(self, names, start, stop):
+        self.names = names
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            return self.names[self.start + start:self.start + stop:step]
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError(item)
+        return self.names[self.start + item]
+
+
+class PrefixIndex:
+    """Sorted, case-insensitive prefix index over a list of usernames"""
+
+    def __init__(self, usernames):
+        pairs = sorted((username.lower(), username) for username in usernames)
+        self.keys = [key for key, _ in pairs]
+        self.names = [name for _, name in pairs]
+
+    def search(self, prefix) -> IndexRange:
+        prefix = prefix.strip().lstrip("@").lower()
+        if not prefix:
+            return IndexRange(self.names, 0, len(self.names))
+        start = bisect_left(self.keys, prefix)
+        # "\uffff" ordena después de cualquier carácter válido en un username
+        stop = bisect_left(self.keys, prefix + "\uffff", start)
+        return IndexRange(self.names, start, stop)
+
+
+_indexes = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_prefix_index(key, usernames) -> PrefixIndex:
+    """Return the cached index for key, building it once from usernames.
+
+    Keys built from snapshots should include snapshot_version_key(path), so a
+    snapshot rewritten on disk gets a new index.
+    """
+    with _lock:
+        if key in _indexes:
+            _indexes.move_to_end(key)
+            return _indexes[key]
+
+    index = PrefixIndex(usernames)
+    with _lock:
+        _indexes[key] = index
+        while len(_indexes) > MAX_CACHED_INDEXES:
+            _indexes.popitem(last=False)
+    return index
@@ -0,0 +1,163 @@
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from config.settings import SNAPSHOT_CACHE_MAX_BYTES
+
+# Marcador "sin cambios": un snapshot idéntico al anterior que solo apunta a él
+UNCHANGED_MARKER_SUFFIX = ".unchanged"
+
+# Campos propios del marcador; el resto (listas) viene del snapshot base
+MARKER_FIELDS = ('account', 'extraction_date', 'account_info', 'stats', 'content_hash')
+
+
+def is_unchanged_marker(file_path) -> bool:
+    return Path(file_path).suffix == UNCHANGED_MARKER_SUFFIX
+
+
+def read_unchanged_marker(file_path) -> dict:
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def resolve_snapshot_path(file_path) -> Path:
+    """Path of the JSON holding the lists of a snapshot (the base file for markers).
+
+    A marker stores its base as a path relative to the marker's directory.
+    """
+    path = Path(file_path)
+    if not is_unchanged_marker(path):
+        return path
+    return Path(os.path.normpath(path.parent / read_unchanged_marker(path)['unchanged_since']))
+
+
+def snapshot_version_key(file_path) -> tuple:
+    """(path, mtime_ns, size) of the file holding a snapshot's lists; changes when it is rewritten"""
+    path = resolve_snapshot_path(file_path)
+    stat = path.stat()
+    return str(path), stat.st_mtime_ns, stat.st_size
+
+
+def estimate_memory_bytes(data) -> int:
+    """Approximate in-memory size of parsed JSON: the containers plus every key and value they hold"""
+    total = 0
+    pending = [data]
+    while pending:
+        item = pending.pop()
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            pending.extend(item.keys())
+            pending.extend(item.values())
+        elif isinstance(item, list):
+            pending.extend(item)
+    return total
+
+
+class SnapshotCache:
+    """Process-wide LRU cache of parsed snapshot JSON files.
+
+    Entries are keyed by path plus mtime/size, so a file rewritten on disk is
+    parsed again. The budget is measured in estimated bytes of the parsed
+    data, which is several times the size of the file. Cached dicts are
+    shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes=SNAPSHOT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _make_key(self, file_path):
+        path = Path(file_path)
+        stat = path.stat()
+        return str(path.resolve()), stat.st_mtime_ns, stat.st_size
+
+    def get(self, file_path) -> dict:
+        """Return the parsed JSON for file_path, parsing it only on a miss.
+
+        For an unchanged marker, the base snapshot's lists are returned with
+        the marker's own date, account info and stats.
+        """
+        if is_unchanged_marker(file_path):
+            marker = read_unchanged_marker(file_path)
+            base = self.get(os.path.normpath(Path(file_path).parent / marker['unchanged_since']))
+            data = dict(base)
+            data.update({field: marker[field] for field in MARKER_FIELDS if field in marker})
+            data['unchanged_since'] = marker['unchanged_since']
+            return data
+
+        key = self._make_key(file_path)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        self.put(key, data)
+        return data
+
+    def put(self, key, data):
+        # Se estima fuera del lock: recorre todas las listas del snapshot
+        size = estimate_memory_bytes(data)
+        with self._lock:
+            self._remove_path(key[0])
+            if size > self.max_bytes:
+                return
+
+            self._entries[key] = (data, size)
+            self.current_bytes += size
+            self._evict()
+
+    def _remove_path(self, resolved):
+        # Quitar versiones anteriores del mismo archivo
+        for old_key in [k for k in self._entries if k[0] == resolved]:
+            self.current_bytes -= self._entries.pop(old_key)[1]
+
+    def _evict(self):
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.current_bytes -= size
+
+    def set_max_bytes(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def invalidate(self, file_path=None):
+        """Drop one file (or everything) from the cache"""
+        with self._lock:
+            if file_path is None:
+                self._entries.clear()
+                self.current_bytes = 0
+                return
+            self._remove_path(str(Path(file_path).resolve()))
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'current_bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+
+snapshot_cache = SnapshotCache()
+
+
+def get_snapshot_cache() -> SnapshotCache:
+    return snapshot_cache
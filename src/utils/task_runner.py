@@ -0,0 +1,50 @@
+import threading
+
+
+class CancelToken:
+    def __init__(self):
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+
+class LatestTaskRunner:
+    """Runs one background task per view; submitting a new one cancels the previous.
+
+    Tasks receive a CancelToken as first argument and should check it between
+    stages so a superseded request stops rendering stale results.
+    """
+
+    def __init__(self, executor, logger):
+        self.executor = executor
+        self.logger = logger
+        self._token = None
+        self._future = None
+        self._lock = threading.Lock()
+
+    def submit(self, task, *args):
+        token = CancelToken()
+        with self._lock:
+            if self._token:
+                self._token.cancel()
+            if self._future:
+                self._future.cancel()  # Si aún no empezó, no llega a ejecutarse
+            self._token = token
+            self._future = self.executor.submit(self._run, task, token, *args)
+        return token
+
+    def _run(self, task, token, *args):
+        try:
+            task(token, *args)
+        except Exception as e:
+            self.logger.error(f"Error en tarea en segundo plano: {e}")
+
+    def cancel(self):
+        with self._lock:
+            if self._token:
+                self._token.cancel()
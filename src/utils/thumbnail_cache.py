@@ -0,0 +1,243 @@
+import hashlib
+import io
+import json
+import os
+import threading
+import urllib.request
+from collections import OrderedDict
+from pathlib import Path
+
+try:
+    from PIL import Image
+except ImportError:  # Sin Pillow se guarda la imagen original
+    Image = None
+
+from config.settings import (
+    THUMBNAIL_CACHE_MAX_BYTES,
+    THUMBNAIL_FETCH_WORKERS,
+    THUMBNAIL_INDEX_SAVE_DELAY_SECONDS,
+    THUMBNAIL_MAX_QUEUED,
+    THUMBNAIL_SIZE,
+)
+from utils.debounce import Debouncer
+
+
+def fetch_url(url) -> bytes:
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return response.read()
+
+
+class ThumbnailCache:
+    """Content-addressed, disk-backed LRU cache of downscaled profile pictures.
+
+    ``get`` never blocks: it returns the cached file path or None and queues
+    the download, calling ``on_ready(path)`` once it is stored. The queue is
+    bounded and served newest first, so rows just scrolled into view load
+    before older requests; ``release`` drops the callback of a row that is no
+    longer shown. ``fetcher`` can be swapped for a stub.
+    """
+
+    def __init__(self, cache_dir, logger, max_bytes=THUMBNAIL_CACHE_MAX_BYTES,
+                 fetcher=fetch_url, max_workers=THUMBNAIL_FETCH_WORKERS, size=THUMBNAIL_SIZE,
+                 max_queued=THUMBNAIL_MAX_QUEUED):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.logger = logger
+        self.max_bytes = max_bytes
+        self.fetcher = fetcher
+        self.size = size
+        self.max_queued = max_queued
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._queue_ready = threading.Condition(self._lock)
+        self._closed = False
+        self._queue = OrderedDict()  # url_key -> url, descargas aún no empezadas
+        self._pending = set()  # En cola o descargándose
+        self._waiters = {}  # url_key -> callbacks on_ready
+        self._url_index = {}
+        self._hash_urls = {}  # content hash -> url_keys que apuntan a él
+        self._entries = OrderedDict()  # content hash -> bytes, en orden LRU
+        self._total_bytes = 0
+        self._schedule_index_save = Debouncer(THUMBNAIL_INDEX_SAVE_DELAY_SECONDS, self._save_index)
+        self._load()
+        for _ in range(max_workers):
+            threading.Thread(target=self._work, daemon=True).start()
+
+    @property
+    def index_path(self) -> Path:
+        return self.cache_dir / "index.json"
+
+    def _load(self):
+        for file_path in sorted(self.cache_dir.glob("*.img"), key=lambda p: p.stat().st_mtime):
+            self._entries[file_path.stem] = file_path.stat().st_size
+        self._total_bytes = sum(self._entries.values())
+        if self.index_path.exists():
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    stored = json.load(f)
+                self._url_index = {
+                    url_key: content_hash
+                    for url_key, content_hash in stored.items()
+                    if content_hash in self._entries
+                }
+            except Exception as e:
+                self.logger.warning(f"Índice de miniaturas dañado: {e}")
+        for url_key, content_hash in self._url_index.items():
+            self._hash_urls.setdefault(content_hash, set()).add(url_key)
+
+    def _save_index(self):
+        with self._lock:
+            url_index = dict(self._url_index)
+        # Se escribe fuera del lock para no frenar a get()
+        with self._save_lock:
+            tmp_path = self.index_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(url_index, f)
+            os.replace(tmp_path, self.index_path)
+
+    def _path_for(self, content_hash) -> Path:
+        return self.cache_dir / f"{content_hash}.img"
+
+    @staticmethod
+    def _url_key(url) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def get(self, url, on_ready=None):
+        """Cached thumbnail path for url, or None (the download is queued and on_ready called with the path)"""
+        if not url:
+            return None
+        url_key = self._url_key(url)
+        with self._lock:
+            content_hash = self._url_index.get(url_key)
+            if content_hash in self._entries:
+                self._entries.move_to_end(content_hash)
+                return str(self._path_for(content_hash))
+            if self._closed:
+                return None
+            if on_ready:
+                self._waiters.setdefault(url_key, []).append(on_ready)
+            if url_key in self._queue:
+                # Pedida otra vez: vuelve a estar a la vista, pasa al frente
+                self._queue.move_to_end(url_key)
+                return None
+            if url_key in self._pending:
+                return None
+            self._pending.add(url_key)
+            self._queue[url_key] = url
+            if len(self._queue) > self.max_queued:
+                dropped, _ = self._queue.popitem(last=False)
+                self._pending.discard(dropped)
+                self._waiters.pop(dropped, None)
+            self._queue_ready.notify()
+        return None
+
+    def release(self, url, on_ready):
+        """Forget on_ready for url (its row is gone); a queued download nobody waits for is dropped"""
+        if not url:
+            return
+        url_key = self._url_key(url)
+        with self._lock:
+            waiters = self._waiters.get(url_key)
+            if waiters is None or on_ready not in waiters:
+                return
+            waiters.remove(on_ready)
+            if not waiters:
+                del self._waiters[url_key]
+                if self._queue.pop(url_key, None) is not None:
+                    self._pending.discard(url_key)
+
+    def _work(self):
+        while True:
+            with self._lock:
+                while not self._queue and not self._closed:
+                    self._queue_ready.wait()
+                if self._closed:
+                    return
+                # Lo último pedido es lo que está a la vista
+                url_key, url = self._queue.popitem(last=True)
+            self._fetch(url, url_key)
+
+    def prefetch(self, urls):
+        for url in urls:
+            self.get(url)
+
+    def _downscale(self, data) -> bytes:
+        if Image is None:
+            return data
+        with Image.open(io.BytesIO(data)) as image:
+            image = image.convert("RGB")
+            image.thumbnail((self.size, self.size))
+            output = io.BytesIO()
+            image.save(output, format="JPEG", quality=85)
+            return output.getvalue()
+
+    def _fetch(self, url, url_key):
+        path = None
+        try:
+            thumbnail = self._downscale(self.fetcher(url))
+            content_hash = hashlib.sha256(thumbnail).hexdigest()
+            path = self._path_for(content_hash)
+            with self._lock:
+                if content_hash not in self._entries:
+                    path.write_bytes(thumbnail)
+                    self._entries[content_hash] = len(thumbnail)
+                    self._total_bytes += len(thumbnail)
+                self._entries.move_to_end(content_hash)
+                previous = self._url_index.get(url_key)
+                if previous is not None and previous != content_hash:
+                    self._hash_urls.get(previous, set()).discard(url_key)
+                self._url_index[url_key] = content_hash
+                self._hash_urls.setdefault(content_hash, set()).add(url_key)
+                self._evict()
+            self._schedule_index_save()
+        except Exception as e:
+            self.logger.warning(f"No se pudo descargar la miniatura: {e}")
+            path = None
+        finally:
+            with self._lock:
+                self._pending.discard(url_key)
+                waiters = self._waiters.pop(url_key, [])
+
+        if path is None:
+            return
+        for on_ready in waiters:
+            try:
+                on_ready(str(path))
+            except Exception as e:
+                self.logger.warning(f"Error mostrando la miniatura: {e}")
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            content_hash, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                self._path_for(content_hash).unlink()
+            except FileNotFoundError:
+                pass
+            for url_key in self._hash_urls.pop(content_hash, ()):
+                del self._url_index[url_key]
+
+    def close(self):
+        """Stop the download workers (queued downloads are dropped) and save the index"""
+        with self._lock:
+            self._closed = True
+            self._queue.clear()
+            self._pending.clear()
+            self._waiters.clear()
+            self._queue_ready.notify_all()
+        self._schedule_index_save.cancel()
+        self._save_index()
+
+
+class AvatarSource:
+    """Thumbnails of the users of one snapshot list, looked up by username"""
+
+    def __init__(self, cache, urls):
+        self.cache = cache
+        self.urls = urls
+
+    def __call__(self, username, on_ready=None):
+        return self.cache.get(self.urls.get(username), on_ready)
+
+    def release(self, username, on_ready):
+        self.cache.release(self.urls.get(username), on_ready)
@@ -0,0 +1,151 @@
+import functools
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Límites superiores de los buckets del histograma (segundos)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+        for position, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.bucket_counts[position] += 1
+                break
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation"""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for bound, bucket_count in zip(self.buckets, self.bucket_counts):
+            seen += bucket_count
+            if seen >= target:
+                return bound
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "avg": round(self.total / self.count, 6) if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": dict(zip(map(str, self.buckets), self.bucket_counts)),
+        }
+
+
+class Tracer:
+    """In-memory timing histograms per span name, plus the most recent spans"""
+
+    def __init__(self, recent=200):
+        self._histograms = {}
+        self._recent = deque(maxlen=recent)
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, error=False):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(seconds)
+            self._recent.append({
+                "name": name,
+                "seconds": round(seconds, 6),
+                "error": error,
+                "thread": threading.current_thread().name,
+                "ended_at": time.time(),
+            })
+
+    @contextmanager
+    def span(self, name):
+        started = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.record(name, time.perf_counter() - started, error)
+
+    def traced(self, name=None):
+        def decorator(function):
+            span_name = name or f"{function.__module__}.{function.__qualname__}"
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {name: histogram.to_dict() for name, histogram in sorted(self._histograms.items())}
+
+    def recent_spans(self) -> list:
+        with self._lock:
+            return list(self._recent)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._recent.clear()
+
+    # =====================| Exportación |=====================
+    def to_json(self) -> str:
+        return json.dumps({"spans": self.summary(), "recent": self.recent_spans()}, indent=2)
+
+    def to_prometheus(self, metric="span_duration_seconds") -> str:
+        lines = [
+            f"# HELP {metric} Duración de las operaciones instrumentadas",
+            f"# TYPE {metric} histogram",
+        ]
+        with self._lock:
+            for name, histogram in sorted(self._histograms.items()):
+                label = name.replace("\\", "\\\\").replace('"', '\\"')
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.buckets, histogram.bucket_counts):
+                    cumulative += bucket_count
+                    lines.append(f'{metric}_bucket{{span="{label}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{span="{label}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{metric}_sum{{span="{label}"}} {histogram.total}')
+                lines.append(f'{metric}_count{{span="{label}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+
+# Tracer compartido por todo el proceso
+tracer = Tracer()
+
+
+def trace_span(name):
+    """Context manager timing a block under `name`"""
+    return tracer.span(name)
+
+
+def traced(name=None):
+    """Decorator timing every call of a function (default name: module.qualname)"""
+    return tracer.traced(name)
+
+
+def get_tracer() -> Tracer:
+    return tracer